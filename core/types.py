@@ -162,6 +162,7 @@ class ToolResult:
     execution_time_ms: int = 0
     side_effects: List[SideEffect] = field(default_factory=list)
     warnings: List[str] = field(default_factory=list)
+    result_json: Optional[bytes] = None  # Pre-encoded result, if the tool provided one
     
     def to_dict(self) -> Dict:
         return {
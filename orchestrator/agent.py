@@ -112,7 +112,10 @@ class AgentOrchestrator:
         """Format tool result for LLM context"""
         if result.status == ExecutionStatus.SUCCESS:
             # Truncate large results
-            result_str = json.dumps(result.result, indent=2)
+            if result.result_json is not None:
+                result_str = result.result_json.decode("utf-8")
+            else:
+                result_str = json.dumps(result.result, indent=2)
             if len(result_str) > 1000:
                 result_str = result_str[:1000] + "... (truncated)"
             return f"Tool '{result.request_id}' executed successfully.\nResult: {result_str}"
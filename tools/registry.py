@@ -98,9 +98,15 @@ def create_all_tools() -> List[Tuple[ToolSchema, callable]]:
                 {"name": "source", "type": "string", "description": "Source path"},
                 {"name": "destination", "type": "string", "description": "Destination path"},
                 {"name": "overwrite", "type": "boolean", "description": "Overwrite if exists", "default": False, "required": False},
+                {"name": "preserve_metadata", "type": "boolean", "description": "Also copy timestamps and permissions", "default": False, "required": False},
             ],
         ),
-        lambda args: fs.copy(args["source"], args["destination"], args.get("overwrite", False))
+        lambda args: fs.copy(
+            args["source"],
+            args["destination"],
+            args.get("overwrite", False),
+            args.get("preserve_metadata", False),
+        )
     ))
     
     # file_move
@@ -184,6 +190,21 @@ def create_all_tools() -> List[Tuple[ToolSchema, callable]]:
         lambda args: fs.get_file_info(args["path"])
     ))
     
+    # file_hash
+    tools.append((
+        create_tool_schema(
+            name="file_hash",
+            description="Compute the checksum of a file",
+            category=ToolCategory.FILE_SYSTEM,
+            risk_level=RiskLevel.LOW,
+            parameters=[
+                {"name": "path", "type": "string", "description": "Path to the file"},
+                {"name": "algorithm", "type": "string", "description": "Hash algorithm", "default": "sha256", "required": False},
+            ],
+        ),
+        lambda args: fs.hash_file(args["path"], args.get("algorithm", "sha256"))
+    ))
+    
     # ========== APPLICATION TOOLS ==========
     
     # app_open
@@ -252,9 +273,17 @@ def create_all_tools() -> List[Tuple[ToolSchema, callable]]:
             risk_level=RiskLevel.LOW,
             parameters=[
                 {"name": "filter", "type": "string", "description": "Filter by process name", "required": False},
+                {"name": "detailed", "type": "boolean", "description": "Include exe path and username (slower)", "default": True, "required": False},
+                {"name": "fields", "type": "array", "description": "Only return these fields (pid, name, exe, status, username, memory_mb)", "required": False},
+                {"name": "include_memory", "type": "boolean", "description": "Collect memory_mb (needed to sort by memory)", "default": False, "required": False},
             ],
         ),
-        lambda args: proc.list_processes(args.get("filter"))
+        lambda args: proc.list_processes(
+            args.get("filter"),
+            detailed=args.get("detailed", True),
+            fields=args.get("fields"),
+            include_memory=args.get("include_memory", False),
+        )
     ))
     
     # process_info
@@ -266,9 +295,10 @@ def create_all_tools() -> List[Tuple[ToolSchema, callable]]:
             risk_level=RiskLevel.LOW,
             parameters=[
                 {"name": "pid", "type": "integer", "description": "Process ID"},
+                {"name": "memory_full", "type": "boolean", "description": "Include a detailed memory breakdown", "default": False, "required": False},
             ],
         ),
-        lambda args: proc.get_process_info(args["pid"])
+        lambda args: proc.get_process_info(args["pid"], args.get("memory_full", False))
     ))
     
     # process_kill
@@ -283,12 +313,14 @@ def create_all_tools() -> List[Tuple[ToolSchema, callable]]:
                 {"name": "pid", "type": "integer", "description": "Process ID", "required": False},
                 {"name": "name", "type": "string", "description": "Process name", "required": False},
                 {"name": "force", "type": "boolean", "description": "Force kill", "default": False, "required": False},
+                {"name": "all_instances", "type": "boolean", "description": "Kill every process with this name, not just the first", "default": True, "required": False},
             ],
         ),
         lambda args: proc.kill_process(
             pid=args.get("pid"),
             name=args.get("name"),
             force=args.get("force", False),
+            all_instances=args.get("all_instances", True),
         )
     ))
     
@@ -377,9 +409,10 @@ def create_all_tools() -> List[Tuple[ToolSchema, callable]]:
             parameters=[
                 {"name": "text", "type": "string", "description": "Text to type"},
                 {"name": "interval", "type": "number", "description": "Delay between keys (seconds)", "default": 0.02, "required": False},
+                {"name": "blocking", "type": "boolean", "description": "Wait until typing finishes; false queues it and returns immediately", "default": True, "required": False},
             ],
         ),
-        lambda args: kbd.type_text(args["text"], args.get("interval", 0.02))
+        lambda args: kbd.type_text(args["text"], args.get("interval", 0.02), args.get("blocking", True))
     ))
     
     # keyboard_press
@@ -459,9 +492,10 @@ def create_all_tools() -> List[Tuple[ToolSchema, callable]]:
                 {"name": "clicks", "type": "integer", "description": "Scroll amount (positive=up, negative=down)"},
                 {"name": "x", "type": "integer", "description": "X coordinate", "required": False},
                 {"name": "y", "type": "integer", "description": "Y coordinate", "required": False},
+                {"name": "split", "type": "integer", "description": "Number of wheel events to spread the clicks over", "default": 1, "required": False},
             ],
         ),
-        lambda args: mouse.scroll(args["clicks"], args.get("x"), args.get("y"))
+        lambda args: mouse.scroll(args["clicks"], args.get("x"), args.get("y"), args.get("split", 1))
     ))
     
     # mouse_drag
@@ -203,6 +203,7 @@ class ToolServer:
                         side_effects=side_effects,
                         warnings=result.get("warnings", []),
                         execution_time_ms=execution_time,
+                        result_json=result.get("result_json"),
                     )
             else:
                 tool_result = ToolResult(
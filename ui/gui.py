@@ -4,7 +4,7 @@ Modern chat-style interface for the Windows AI Agent
 """
 import sys
 import os
-from typing import Optional
+from typing import Optional, TYPE_CHECKING
 from datetime import datetime
 
 # Check if PyQt6 is available
@@ -16,50 +16,65 @@ try:
         QSystemTrayIcon, QMenu, QStatusBar, QToolBar, QDialog,
         QDialogButtonBox, QCheckBox
     )
-    from PyQt6.QtCore import Qt, QThread, pyqtSignal, QTimer, QSize
-    from PyQt6.QtGui import QFont, QIcon, QAction, QColor, QPalette, QTextCursor
+    from PyQt6.QtCore import (
+        Qt, QObject, QRunnable, QThreadPool, pyqtSignal, QTimer, QSize
+    )
     HAS_PYQT = True
 except ImportError:
     HAS_PYQT = False
     print("PyQt6 not installed. Install with: pip install PyQt6")
 
 if HAS_PYQT:
+    import json
+    
     # Add parent to path
     sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
     
-    from orchestrator.agent import AgentOrchestrator, create_agent
+    # The orchestrator pulls in the LLM client and every tool controller;
+    # it is imported when the agent is created, after the window is shown
+    if TYPE_CHECKING:
+        from orchestrator.agent import AgentOrchestrator
     from core.types import ToolRequest, ToolResult, ExecutionStatus
     
     
-    class AgentWorker(QThread):
-        """Worker thread for agent processing"""
+    class AgentSignals(QObject):
+        """Signals emitted by agent tasks, shared for the window's lifetime"""
         response_ready = pyqtSignal(str)
         thinking = pyqtSignal(str)
         tool_call = pyqtSignal(str, dict)
         tool_result = pyqtSignal(str, bool)
         error = pyqtSignal(str)
+        finished = pyqtSignal()
+    
+    
+    class AgentTask(QRunnable):
+        """Agent processing task run on the Qt thread pool"""
         
-        def __init__(self, agent: AgentOrchestrator, message: str):
+        def __init__(self, agent: "AgentOrchestrator", message: str, signals: AgentSignals):
             super().__init__()
             self.agent = agent
             self.message = message
+            self.signals = signals
         
         def run(self):
+            signals = self.signals
             try:
                 # Set up callbacks
                 self.agent.set_callbacks(
-                    on_thinking=lambda t: self.thinking.emit(t),
-                    on_tool_call=lambda r: self.tool_call.emit(r.tool, r.arguments),
-                    on_tool_result=lambda r: self.tool_result.emit(
+                    on_thinking=lambda t: signals.thinking.emit(t),
+                    on_tool_call=lambda r: signals.tool_call.emit(r.tool, r.arguments),
+                    on_tool_result=lambda r: signals.tool_result.emit(
                         r.status.value, 
                         r.status == ExecutionStatus.SUCCESS
                     ),
                 )
                 
                 response = self.agent.process(self.message)
-                self.response_ready.emit(response)
+                signals.response_ready.emit(response)
             except Exception as e:
-                self.error.emit(str(e))
+                signals.error.emit(str(e))
+            finally:
+                signals.finished.emit()
     
     
     class ConfirmationDialog(QDialog):
@@ -81,8 +96,7 @@ if HAS_PYQT:
             args_text = QTextEdit()
             args_text.setReadOnly(True)
             args_text.setMaximumHeight(100)
-            import json
-            args_text.setPlainText(json.dumps(request.arguments, indent=2))
+            args_text.setPlainText(json.dumps(request.arguments, indent=2, default=str))
             layout.addWidget(args_text)
             
             # Remember choice checkbox
@@ -145,18 +159,29 @@ if HAS_PYQT:
         def __init__(self, model: str = "llama4"):
             super().__init__()
             self.model = model
-            self.agent: Optional[AgentOrchestrator] = None
-            self.worker: Optional[AgentWorker] = None
+            self.agent: Optional["AgentOrchestrator"] = None
             self.auto_confirm = False
             
+            # One signal emitter for all tasks; connected once
+            self._signals = AgentSignals()
+            self._signals.thinking.connect(self._on_thinking)
+            self._signals.tool_call.connect(self._on_tool_call)
+            self._signals.tool_result.connect(self._on_tool_result)
+            self._signals.response_ready.connect(self._on_response)
+            self._signals.error.connect(self._on_error)
+            self._signals.finished.connect(self._on_finished)
+            
             self.setWindowTitle("Windows AI Agent")
             self.setMinimumSize(800, 600)
             
             self._setup_ui()
-            self._setup_agent()
+            # Let the window paint before connecting to Ollama
+            QTimer.singleShot(0, self._setup_agent)
         
         def _setup_ui(self):
             """Setup the user interface"""
+            from PyQt6.QtGui import QAction
+            
             # Central widget
             central = QWidget()
             self.setCentralWidget(central)
@@ -212,6 +237,8 @@ if HAS_PYQT:
         
         def _setup_agent(self):
             """Initialize the agent"""
+            from orchestrator.agent import create_agent
+            
             self.agent = create_agent(
                 model=self.model,
                 verbose=False,
@@ -282,15 +309,8 @@ if HAS_PYQT:
             self._add_message(text, is_user=True)
             self.input_field.clear()
             
-            # Start worker thread
-            self.worker = AgentWorker(self.agent, text)
-            self.worker.thinking.connect(self._on_thinking)
-            self.worker.tool_call.connect(self._on_tool_call)
-            self.worker.tool_result.connect(self._on_tool_result)
-            self.worker.response_ready.connect(self._on_response)
-            self.worker.error.connect(self._on_error)
-            self.worker.finished.connect(self._on_finished)
-            self.worker.start()
+            # Run on a pooled thread
+            QThreadPool.globalInstance().start(AgentTask(self.agent, text, self._signals))
         
         def _on_thinking(self, thought: str):
             """Handle thinking event"""
@@ -316,7 +336,7 @@ if HAS_PYQT:
             self.status_label.setText("")
         
         def _on_finished(self):
-            """Handle worker finished"""
+            """Handle agent task finished"""
             self.input_field.setEnabled(True)
             self.send_button.setEnabled(True)
             self.input_field.setFocus()
@@ -3,10 +3,17 @@ Windows AI Agent - File System Control
 Cross-platform file operations with Windows-specific enhancements
 """
 import os
+import sys
+import stat
 import shutil
 import glob
+import fnmatch
+import re
 import json
+import base64
 import hashlib
+import atexit
+import tempfile
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Optional, Any
@@ -14,6 +21,45 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+IS_WINDOWS = sys.platform == "win32"
+
+if IS_WINDOWS:
+    import ctypes
+    from ctypes import wintypes
+    
+    _kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+    
+    _CopyFileExW = _kernel32.CopyFileExW
+    _CopyFileExW.argtypes = [
+        wintypes.LPCWSTR, wintypes.LPCWSTR, wintypes.LPVOID,
+        wintypes.LPVOID, wintypes.LPBOOL, wintypes.DWORD,
+    ]
+    _CopyFileExW.restype = wintypes.BOOL
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+
+def _fast_copyfile(src: str, dst: str) -> str:
+    """Copy file contents only, using the OS copy primitive"""
+    if IS_WINDOWS:
+        # CopyFileExW copies in-kernel; flags=0 overwrites an existing dst
+        if not _CopyFileExW(src, dst, None, None, None, 0):
+            raise ctypes.WinError(ctypes.get_last_error())
+        return dst
+    # copyfile uses sendfile/copy_file_range where available
+    return shutil.copyfile(src, dst)
+
+
+def _encode(obj: Any) -> bytes:
+    """Pre-encode a large result so the orchestrator need not re-serialize it"""
+    if HAS_ORJSON:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NAIVE_UTC)
+    return json.dumps(obj, indent=2, default=str).encode("utf-8")
+
 
 class FileSystemController:
     """
@@ -35,14 +81,22 @@ class FileSystemController:
             os.path.expanduser("~"),
         ]
         self._snapshots: Dict[str, Dict] = {}  # For rollback
+        atexit.register(self._discard_snapshots)
+        
+        # Normalized once: (case-folded path + separator, original)
+        self._protected_norm = tuple(
+            (os.path.normcase(os.path.abspath(p)).rstrip(os.sep) + os.sep, p)
+            for p in self.protected_paths
+        )
     
     def _is_path_safe(self, path: str) -> tuple[bool, str]:
         """Check if path is safe to access"""
-        path = os.path.abspath(path)
+        path = os.path.normcase(os.path.abspath(path))
         
-        # Check protected paths
-        for protected in self.protected_paths:
-            if path.lower().startswith(protected.lower()):
+        # Check protected paths; matching on a separator boundary keeps
+        # e.g. C:\Windows2 from matching C:\Windows
+        for prefix, protected in self._protected_norm:
+            if path == prefix[:-1] or path.startswith(prefix):
                 return False, f"Path is protected: {protected}"
         
         return True, ""
@@ -57,6 +111,41 @@ class FileSystemController:
         path = os.path.normpath(path)
         return path
     
+    def _walk(
+        self,
+        path: str,
+        name_filter: "re.Pattern",
+        recursive: bool = False,
+        include_hidden: bool = False,
+    ):
+        """Yield (entry, stat) pairs under path whose name matches name_filter"""
+        try:
+            with os.scandir(path) as it:
+                entries = list(it)
+        except OSError:
+            return
+        
+        for entry in entries:
+            name = entry.name
+            if not include_hidden and name[0] == '.':
+                continue
+            
+            matched = name_filter.match(name)
+            if not matched and not recursive:
+                continue
+            
+            # One stat per entry; callers derive is_dir/size/times from it
+            try:
+                st = entry.stat(follow_symlinks=False)
+            except OSError:
+                continue
+            
+            if matched:
+                yield entry, st
+            
+            if recursive and stat.S_ISDIR(st.st_mode):
+                yield from self._walk(entry.path, name_filter, recursive, include_hidden)
+    
     # === Read Operations ===
     
     def read_file(self, path: str, encoding: str = "utf-8") -> Dict[str, Any]:
@@ -68,14 +157,18 @@ class FileSystemController:
             return {"error": msg}
         
         try:
-            if not os.path.exists(path):
+            # Single stat instead of exists/isfile/getsize
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
                 return {"error": f"File not found: {path}"}
             
-            if not os.path.isfile(path):
+            # FIFOs and devices report size 0 but may never end
+            if not stat.S_ISREG(st.st_mode):
                 return {"error": f"Not a file: {path}"}
             
             # Check file size
-            size = os.path.getsize(path)
+            size = st.st_size
             if size > 10 * 1024 * 1024:  # 10MB limit
                 return {"error": f"File too large: {size} bytes"}
             
@@ -95,8 +188,8 @@ class FileSystemController:
         except Exception as e:
             return {"error": str(e)}
     
-    def read_file_binary(self, path: str) -> Dict[str, Any]:
-        """Read file as binary"""
+    def read_file_binary(self, path: str, max_bytes: int = 64 * 1024) -> Dict[str, Any]:
+        """Read up to max_bytes of a file as base64"""
         path = self._normalize_path(path)
         
         safe, msg = self._is_path_safe(path)
@@ -105,13 +198,15 @@ class FileSystemController:
         
         try:
             with open(path, 'rb') as f:
-                content = f.read()
+                head = f.read(max_bytes)
+                size = os.fstat(f.fileno()).st_size
             
             return {
                 "result": {
-                    "content_base64": content.hex(),
+                    "content_base64": base64.b64encode(head).decode('ascii'),
                     "path": path,
-                    "size": len(content),
+                    "size": size,
+                    "truncated": size > max_bytes,
                 }
             }
         except Exception as e:
@@ -132,46 +227,40 @@ class FileSystemController:
             return {"error": msg}
         
         try:
-            if not os.path.exists(path):
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
                 return {"error": f"Directory not found: {path}"}
             
-            if not os.path.isdir(path):
+            if not stat.S_ISDIR(st.st_mode):
                 return {"error": f"Not a directory: {path}"}
             
             items = []
+            name_filter = re.compile(
+                fnmatch.translate(pattern),
+                re.IGNORECASE if IS_WINDOWS else 0,
+            )
             
-            if recursive:
-                search_pattern = os.path.join(path, "**", pattern)
-                matches = glob.glob(search_pattern, recursive=True)
-            else:
-                search_pattern = os.path.join(path, pattern)
-                matches = glob.glob(search_pattern)
-            
-            for item_path in matches:
-                name = os.path.basename(item_path)
-                
-                # Skip hidden files if not requested
-                if not include_hidden and name.startswith('.'):
-                    continue
-                
-                is_dir = os.path.isdir(item_path)
-                stat = os.stat(item_path)
+            for entry, st in self._walk(path, name_filter, recursive, include_hidden):
+                is_dir = stat.S_ISDIR(st.st_mode)
                 
                 items.append({
-                    "name": name,
-                    "path": item_path,
+                    "name": entry.name,
+                    "path": entry.path,
                     "is_directory": is_dir,
-                    "size": stat.st_size if not is_dir else 0,
-                    "modified": datetime.fromtimestamp(stat.st_mtime).isoformat(),
-                    "created": datetime.fromtimestamp(stat.st_ctime).isoformat(),
+                    "size": st.st_size if not is_dir else 0,
+                    "modified": datetime.fromtimestamp(st.st_mtime).isoformat(),
+                    "created": datetime.fromtimestamp(st.st_ctime).isoformat(),
                 })
             
+            payload = {
+                "path": path,
+                "items": items,
+                "count": len(items),
+            }
             return {
-                "result": {
-                    "path": path,
-                    "items": items,
-                    "count": len(items),
-                }
+                "result": payload,
+                "result_json": _encode(payload),
             }
         except Exception as e:
             return {"error": str(e)}
@@ -181,21 +270,22 @@ class FileSystemController:
         path = self._normalize_path(path)
         
         try:
-            if not os.path.exists(path):
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
                 return {"error": f"Path not found: {path}"}
             
-            stat = os.stat(path)
-            is_dir = os.path.isdir(path)
+            is_dir = stat.S_ISDIR(st.st_mode)
             
             info = {
                 "path": path,
                 "name": os.path.basename(path),
                 "is_directory": is_dir,
-                "is_file": os.path.isfile(path),
-                "size": stat.st_size,
-                "created": datetime.fromtimestamp(stat.st_ctime).isoformat(),
-                "modified": datetime.fromtimestamp(stat.st_mtime).isoformat(),
-                "accessed": datetime.fromtimestamp(stat.st_atime).isoformat(),
+                "is_file": stat.S_ISREG(st.st_mode),
+                "size": st.st_size,
+                "created": datetime.fromtimestamp(st.st_ctime).isoformat(),
+                "modified": datetime.fromtimestamp(st.st_mtime).isoformat(),
+                "accessed": datetime.fromtimestamp(st.st_atime).isoformat(),
             }
             
             # Add extension for files
@@ -206,6 +296,42 @@ class FileSystemController:
         except Exception as e:
             return {"error": str(e)}
     
+    def hash_file(self, path: str, algo: str = "sha256") -> Dict[str, Any]:
+        """Compute a file's digest"""
+        path = self._normalize_path(path)
+        
+        safe, msg = self._is_path_safe(path)
+        if not safe:
+            return {"error": msg}
+        
+        # SHAKE digests need an output length that hexdigest() isn't given
+        if algo not in hashlib.algorithms_available or algo.startswith("shake_"):
+            return {"error": f"Unsupported hash algorithm: {algo}"}
+        
+        try:
+            with open(path, 'rb') as f:
+                if hasattr(hashlib, "file_digest"):
+                    # Python 3.11+: stays in C and releases the GIL
+                    digest = hashlib.file_digest(f, algo)
+                else:
+                    digest = hashlib.new(algo)
+                    for chunk in iter(lambda: f.read(256 * 1024), b""):
+                        digest.update(chunk)
+            
+            return {
+                "result": {
+                    "path": path,
+                    "algorithm": algo,
+                    "digest": digest.hexdigest(),
+                }
+            }
+        except FileNotFoundError:
+            return {"error": f"File not found: {path}"}
+        except ValueError:
+            return {"error": f"Unsupported hash algorithm: {algo}"}
+        except Exception as e:
+            return {"error": str(e)}
+    
     def search_files(
         self,
         path: str,
@@ -248,13 +374,15 @@ class FileSystemController:
                     else:
                         results.append(match_info)
             
+            payload = {
+                "matches": results,
+                "count": len(results),
+                "search_path": path,
+                "pattern": pattern,
+            }
             return {
-                "result": {
-                    "matches": results,
-                    "count": len(results),
-                    "search_path": path,
-                    "pattern": pattern,
-                }
+                "result": payload,
+                "result_json": _encode(payload),
             }
         except Exception as e:
             return {"error": str(e)}
@@ -268,8 +396,9 @@ class FileSystemController:
         mode: str = "write",  # write, append
         encoding: str = "utf-8",
         create_dirs: bool = True,
+        snapshot: bool = False,
     ) -> Dict[str, Any]:
-        """Write content to file"""
+        """Write content to file; snapshot=True keeps a copy for rollback_write"""
         path = self._normalize_path(path)
         
         safe, msg = self._is_path_safe(path)
@@ -277,33 +406,64 @@ class FileSystemController:
             return {"error": msg}
         
         try:
-            # Create snapshot for rollback
-            existed = os.path.exists(path)
-            old_content = None
-            if existed and os.path.isfile(path):
-                with open(path, 'r', encoding=encoding, errors='ignore') as f:
-                    old_content = f.read()
+            # Encode up front so an encoding error fails before the file is touched
+            size = len(content.encode(encoding))
+            
+            # Snapshots follow symlinks to the file actually written
+            real_path = os.path.realpath(path)
+            try:
+                st = os.stat(real_path)
+            except FileNotFoundError:
+                st = None
+            existed = st is not None
+            rollback_data = None
             
             # Create directories if needed
             if create_dirs:
                 os.makedirs(os.path.dirname(path), exist_ok=True)
             
-            # Write file
+            # Appends only need the old size; an overwrite copies the
+            # original aside, and only when a snapshot was asked for
+            if existed and stat.S_ISREG(st.st_mode):
+                if mode == "append":
+                    rollback_data = {"truncate_to": st.st_size}
+                elif snapshot:
+                    fd, backup = tempfile.mkstemp(prefix="write_file_", suffix=".bak")
+                    os.close(fd)
+                    shutil.copyfile(real_path, backup)
+                    rollback_data = {"backup_path": backup}
+            
+            # Write in place, keeping the file's mode, links and streams
             file_mode = 'a' if mode == "append" else 'w'
-            with open(path, file_mode, encoding=encoding) as f:
-                f.write(content)
+            try:
+                with open(path, file_mode, encoding=encoding) as f:
+                    f.write(content)
+            except Exception:
+                # 'w' has already truncated the file; put the original back
+                if rollback_data and "backup_path" in rollback_data:
+                    shutil.copyfile(rollback_data["backup_path"], real_path)
+                    os.remove(rollback_data["backup_path"])
+                elif rollback_data:
+                    with open(real_path, 'r+b') as f:
+                        f.truncate(rollback_data["truncate_to"])
+                raise
+            
+            # Only the latest write on a path can be rolled back
+            self._discard_snapshot(real_path)
+            if rollback_data:
+                self._snapshots[real_path] = rollback_data
             
             side_effects = [{
                 "type": "file_modified" if existed else "file_created",
                 "path": path,
-                "reversible": True,
-                "rollback_data": old_content,
+                "reversible": rollback_data is not None or not existed,
+                "rollback_data": rollback_data,
             }]
             
             return {
                 "result": {
                     "path": path,
-                    "bytes_written": len(content.encode(encoding)),
+                    "bytes_written": size,
                     "mode": mode,
                 },
                 "side_effects": side_effects,
@@ -311,6 +471,42 @@ class FileSystemController:
         except Exception as e:
             return {"error": str(e)}
     
+    def rollback_write(self, path: str) -> Dict[str, Any]:
+        """Undo the last write_file call on a path"""
+        path = self._normalize_path(path)
+        real_path = os.path.realpath(path)
+        rollback_data = self._snapshots.pop(real_path, None)
+        
+        try:
+            if rollback_data is None:
+                return {"error": f"No rollback data for: {path}"}
+            
+            if "backup_path" in rollback_data:
+                # Copy back in place rather than renaming over the file
+                shutil.copyfile(rollback_data["backup_path"], real_path)
+                os.remove(rollback_data["backup_path"])
+            else:
+                with open(real_path, 'r+b') as f:
+                    f.truncate(rollback_data["truncate_to"])
+            
+            return {"result": {"path": path, "restored": True}}
+        except Exception as e:
+            return {"error": str(e)}
+    
+    def _discard_snapshot(self, real_path: str):
+        """Forget a path's snapshot and delete its backup copy"""
+        previous = self._snapshots.pop(real_path, None)
+        if previous and "backup_path" in previous:
+            try:
+                os.remove(previous["backup_path"])
+            except OSError:
+                pass
+    
+    def _discard_snapshots(self):
+        """Delete every backup copy still held"""
+        for real_path in list(self._snapshots):
+            self._discard_snapshot(real_path)
+    
     def create_directory(self, path: str, parents: bool = True) -> Dict[str, Any]:
         """Create a directory"""
         path = self._normalize_path(path)
@@ -320,14 +516,14 @@ class FileSystemController:
             return {"error": msg}
         
         try:
-            if os.path.exists(path):
+            try:
+                if parents:
+                    os.makedirs(path)
+                else:
+                    os.mkdir(path)
+            except FileExistsError:
                 return {"error": f"Path already exists: {path}"}
             
-            if parents:
-                os.makedirs(path)
-            else:
-                os.mkdir(path)
-            
             return {
                 "result": {
                     "path": path,
@@ -347,6 +543,7 @@ class FileSystemController:
         source: str,
         destination: str,
         overwrite: bool = False,
+        preserve_metadata: bool = False,
     ) -> Dict[str, Any]:
         """Copy file or directory"""
         source = self._normalize_path(source)
@@ -357,27 +554,35 @@ class FileSystemController:
             return {"error": msg}
         
         try:
-            if not os.path.exists(source):
+            try:
+                src_st = os.stat(source)
+            except FileNotFoundError:
                 return {"error": f"Source not found: {source}"}
             
-            if os.path.exists(destination) and not overwrite:
+            dst_exists = os.path.lexists(destination)
+            if dst_exists and not overwrite:
                 return {"error": f"Destination exists: {destination}"}
             
-            if os.path.isdir(source):
-                if os.path.exists(destination):
+            copy_function = shutil.copy2 if preserve_metadata else _fast_copyfile
+            
+            is_dir = stat.S_ISDIR(src_st.st_mode)
+            if is_dir:
+                if dst_exists:
                     shutil.rmtree(destination)
-                shutil.copytree(source, destination)
+                shutil.copytree(source, destination, copy_function=copy_function)
             else:
-                shutil.copy2(source, destination)
+                if dst_exists and os.path.isdir(destination):
+                    destination = os.path.join(destination, os.path.basename(source))
+                copy_function(source, destination)
             
             return {
                 "result": {
                     "source": source,
                     "destination": destination,
-                    "is_directory": os.path.isdir(destination),
+                    "is_directory": is_dir,
                 },
                 "side_effects": [{
-                    "type": "file_created" if os.path.isfile(destination) else "directory_created",
+                    "type": "directory_created" if is_dir else "file_created",
                     "path": destination,
                     "reversible": True,
                 }]
@@ -404,10 +609,10 @@ class FileSystemController:
             return {"error": msg_dst}
         
         try:
-            if not os.path.exists(source):
+            if not os.path.lexists(source):
                 return {"error": f"Source not found: {source}"}
             
-            if os.path.exists(destination) and not overwrite:
+            if not overwrite and os.path.lexists(destination):
                 return {"error": f"Destination exists: {destination}"}
             
             shutil.move(source, destination)
@@ -442,10 +647,12 @@ class FileSystemController:
             return {"error": msg}
         
         try:
-            if not os.path.exists(path):
+            try:
+                st = os.lstat(path)
+            except FileNotFoundError:
                 return {"error": f"Path not found: {path}"}
             
-            is_dir = os.path.isdir(path)
+            is_dir = stat.S_ISDIR(st.st_mode)
             
             # Store for potential recovery
             if is_dir:
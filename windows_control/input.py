@@ -3,8 +3,14 @@ Windows AI Agent - Input Simulation Controller
 Handles keyboard and mouse input simulation
 """
 import sys
+import array
 import time
+import struct
+import queue
 import logging
+import threading
+from contextlib import contextmanager
+from concurrent.futures import Future, wait
 from typing import Dict, List, Optional, Any, Tuple
 
 logger = logging.getLogger(__name__)
@@ -33,8 +39,25 @@ if IS_WINDOWS:
     MOUSEEVENTF_MIDDLEDOWN = 0x0020
     MOUSEEVENTF_MIDDLEUP = 0x0040
     MOUSEEVENTF_WHEEL = 0x0800
+    MOUSEEVENTF_VIRTUALDESK = 0x4000
     MOUSEEVENTF_ABSOLUTE = 0x8000
     
+    # Virtual desktop bounds (all monitors) for GetSystemMetrics
+    SM_XVIRTUALSCREEN = 76
+    SM_YVIRTUALSCREEN = 77
+    SM_CXVIRTUALSCREEN = 78
+    SM_CYVIRTUALSCREEN = 79
+    
+    # Thread priority and power request flags
+    THREAD_PRIORITY_TIME_CRITICAL = 15
+    ES_SYSTEM_REQUIRED = 0x00000001
+    ES_CONTINUOUS = 0x80000000
+    
+    # Clipboard
+    CF_UNICODETEXT = 13
+    GMEM_MOVEABLE = 0x0002
+    GMEM_ZEROINIT = 0x0040
+    
     # Virtual key codes
     VK_CODES = {
         'backspace': 0x08, 'tab': 0x09, 'enter': 0x0D, 'return': 0x0D,
@@ -57,7 +80,25 @@ if IS_WINDOWS:
     for c in '0123456789':
         VK_CODES[c] = ord(c)
     
-    # Structures for SendInput
+    # Case-exact lookup table so the common spellings ('ctrl', 'CTRL',
+    # 'a', 'A') resolve without allocating a lowered copy of the key
+    _VK_LOOKUP = {**VK_CODES, **{k.upper(): v for k, v in VK_CODES.items()}}
+    
+    def _vk_for(key: str) -> Optional[int]:
+        """Resolve a key name or single character to a virtual key code"""
+        vk = _VK_LOOKUP.get(key)
+        if vk is None:
+            if len(key) == 1:
+                vk = ord(key.upper())
+            else:
+                # Mixed-case names such as 'Enter'
+                vk = VK_CODES.get(key.lower())
+        return vk
+    
+    # Structures for SendInput. dwExtraInfo is a ULONG_PTR (an integer, not
+    # a pointer); it is never assigned and stays 0 from zero-initialization
+    ULONG_PTR = ctypes.c_size_t
+    
     class MOUSEINPUT(ctypes.Structure):
         _fields_ = [
             ("dx", wintypes.LONG),
@@ -65,7 +106,7 @@ if IS_WINDOWS:
             ("mouseData", wintypes.DWORD),
             ("dwFlags", wintypes.DWORD),
             ("time", wintypes.DWORD),
-            ("dwExtraInfo", ctypes.POINTER(ctypes.c_ulong)),
+            ("dwExtraInfo", ULONG_PTR),
         ]
 
     class KEYBDINPUT(ctypes.Structure):
@@ -74,7 +115,7 @@ if IS_WINDOWS:
             ("wScan", wintypes.WORD),
             ("dwFlags", wintypes.DWORD),
             ("time", wintypes.DWORD),
-            ("dwExtraInfo", ctypes.POINTER(ctypes.c_ulong)),
+            ("dwExtraInfo", ULONG_PTR),
         ]
 
     class INPUT(ctypes.Structure):
@@ -88,6 +129,171 @@ if IS_WINDOWS:
             ("type", wintypes.DWORD),
             ("_input", _INPUT),
         ]
+    
+    class POINT(ctypes.Structure):
+        _fields_ = [("x", wintypes.LONG), ("y", wintypes.LONG)]
+    
+    # DLL handles and function prototypes, bound once at import so calls
+    # skip the windll attribute lookup and per-call argument inference
+    _user32 = ctypes.WinDLL('user32', use_last_error=True)
+    _kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+    
+    def _bind(dll, name, argtypes, restype):
+        func = getattr(dll, name)
+        func.argtypes = argtypes
+        func.restype = restype
+        return func
+    
+    _SendInput = _bind(_user32, 'SendInput',
+                       [wintypes.UINT, ctypes.POINTER(INPUT), ctypes.c_int], wintypes.UINT)
+    _SetCursorPos = _bind(_user32, 'SetCursorPos', [ctypes.c_int, ctypes.c_int], wintypes.BOOL)
+    _GetCursorPos = _bind(_user32, 'GetCursorPos', [ctypes.POINTER(POINT)], wintypes.BOOL)
+    _GetSystemMetrics = _bind(_user32, 'GetSystemMetrics', [ctypes.c_int], ctypes.c_int)
+    
+    _OpenClipboard = _bind(_user32, 'OpenClipboard', [wintypes.HWND], wintypes.BOOL)
+    _CloseClipboard = _bind(_user32, 'CloseClipboard', [], wintypes.BOOL)
+    _EmptyClipboard = _bind(_user32, 'EmptyClipboard', [], wintypes.BOOL)
+    _IsClipboardFormatAvailable = _bind(_user32, 'IsClipboardFormatAvailable',
+                                        [wintypes.UINT], wintypes.BOOL)
+    _GetClipboardData = _bind(_user32, 'GetClipboardData', [wintypes.UINT], wintypes.HANDLE)
+    _SetClipboardData = _bind(_user32, 'SetClipboardData',
+                              [wintypes.UINT, wintypes.HANDLE], wintypes.HANDLE)
+    
+    _GlobalAlloc = _bind(_kernel32, 'GlobalAlloc', [wintypes.UINT, ctypes.c_size_t], wintypes.HGLOBAL)
+    _GlobalLock = _bind(_kernel32, 'GlobalLock', [wintypes.HGLOBAL], wintypes.LPVOID)
+    _GlobalUnlock = _bind(_kernel32, 'GlobalUnlock', [wintypes.HGLOBAL], wintypes.BOOL)
+    
+    _winmm = ctypes.WinDLL('winmm')
+    _timeBeginPeriod = _bind(_winmm, 'timeBeginPeriod', [wintypes.UINT], wintypes.UINT)
+    _timeEndPeriod = _bind(_winmm, 'timeEndPeriod', [wintypes.UINT], wintypes.UINT)
+    
+    _GetCurrentThread = _bind(_kernel32, 'GetCurrentThread', [], wintypes.HANDLE)
+    _GetThreadPriority = _bind(_kernel32, 'GetThreadPriority', [wintypes.HANDLE], ctypes.c_int)
+    _SetThreadPriority = _bind(_kernel32, 'SetThreadPriority',
+                               [wintypes.HANDLE, ctypes.c_int], wintypes.BOOL)
+    _SetThreadExecutionState = _bind(_kernel32, 'SetThreadExecutionState',
+                                     [wintypes.DWORD], wintypes.DWORD)
+    
+    class _ThreadPriorityBoost:
+        """Raise the calling thread's priority and keep the system awake for a paced input loop"""
+        
+        def __init__(self, priority: int = THREAD_PRIORITY_TIME_CRITICAL):
+            self._priority = priority
+            self._previous = None
+        
+        def __enter__(self):
+            thread = _GetCurrentThread()  # Pseudo-handle, no need to close
+            previous = _GetThreadPriority(thread)
+            if _SetThreadPriority(thread, self._priority):
+                self._previous = previous
+            _SetThreadExecutionState(ES_SYSTEM_REQUIRED | ES_CONTINUOUS)
+            return self
+        
+        def __exit__(self, *exc):
+            _SetThreadExecutionState(ES_CONTINUOUS)
+            if self._previous is not None:
+                _SetThreadPriority(_GetCurrentThread(), self._previous)
+                self._previous = None
+            return False
+    
+    # Reusable key down/up pair for paced typing; only wScan changes per char
+    _TYPE_PAIR = (INPUT * 2)()
+    for _inp in _TYPE_PAIR:
+        _inp.type = INPUT_KEYBOARD
+    _TYPE_PAIR[0].ki.dwFlags = KEYEVENTF_UNICODE
+    _TYPE_PAIR[1].ki.dwFlags = KEYEVENTF_UNICODE | KEYEVENTF_KEYUP
+    
+    # Byte offsets of MOUSEINPUT fields within an INPUT record, for
+    # filling whole trajectories without touching each struct
+    _MI_OFFSET = INPUT._input.offset + INPUT._INPUT.mi.offset
+    _DX_OFFSET = _MI_OFFSET + MOUSEINPUT.dx.offset
+    _DY_OFFSET = _MI_OFFSET + MOUSEINPUT.dy.offset
+    _MI_FLAGS_OFFSET = _MI_OFFSET + MOUSEINPUT.dwFlags.offset
+    _KI_OFFSET = INPUT._input.offset + INPUT._INPUT.ki.offset
+    
+    def _record_struct(fields: List[Tuple[int, str]]) -> struct.Struct:
+        """Compile a struct.Struct writing the given (offset, code) fields of an INPUT record"""
+        fmt, pos = '=', 0
+        for offset, code in fields:
+            fmt += f"{offset - pos}x{code}" if offset > pos else code
+            pos = offset + struct.calcsize('=' + code)
+        return struct.Struct(fmt)
+    
+    # Packers for the fields each record kind sets; padding comes from the
+    # ctypes layout so they match INPUT on both 32- and 64-bit Python
+    _KEY_RECORD = _record_struct([
+        (INPUT.type.offset, 'I'),
+        (_KI_OFFSET + KEYBDINPUT.wVk.offset, 'H'),
+        (_KI_OFFSET + KEYBDINPUT.wScan.offset, 'H'),
+        (_KI_OFFSET + KEYBDINPUT.dwFlags.offset, 'I'),
+    ])
+    _MOUSE_RECORD = _record_struct([
+        (INPUT.type.offset, 'I'),
+        (_MI_OFFSET + MOUSEINPUT.mouseData.offset, 'i'),  # Signed wheel delta
+        (_MI_FLAGS_OFFSET, 'I'),
+    ])
+    
+    def _pack_keys(events: List[Tuple[int, int, int]]):
+        """Pack (vk, scan, flags) keyboard events into an INPUT array"""
+        stride = ctypes.sizeof(INPUT)
+        block = bytearray(stride * len(events))
+        pack_into = _KEY_RECORD.pack_into
+        for i, (vk, scan, flags) in enumerate(events):
+            pack_into(block, i * stride, INPUT_KEYBOARD, vk, scan, flags)
+        return (INPUT * len(events)).from_buffer(block)
+    
+    def _send_keys(events: List[Tuple[int, int]]) -> int:
+        """Send (vk, flags) keyboard events in a single SendInput call"""
+        inputs = _pack_keys([(vk, 0, flags) for vk, flags in events])
+        return _SendInput(len(events), inputs, ctypes.sizeof(INPUT))
+    
+    def _send_mouse(events: List[Tuple[int, int]]) -> int:
+        """Send (flags, mouseData) mouse events in a single SendInput call"""
+        stride = ctypes.sizeof(INPUT)
+        block = bytearray(stride * len(events))
+        pack_into = _MOUSE_RECORD.pack_into
+        for i, (flags, data) in enumerate(events):
+            pack_into(block, i * stride, INPUT_MOUSE, data, flags)
+        inputs = (INPUT * len(events)).from_buffer(block)
+        return _SendInput(len(events), inputs, stride)
+
+
+_numpy = None
+
+
+def _get_numpy():
+    """Import NumPy on first use; returns None if it is not installed"""
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+            _numpy = numpy
+        except ImportError:
+            _numpy = False
+    return _numpy or None
+
+
+def _sleep_until(deadline: float):
+    """Sleep until a time.perf_counter() deadline, spinning for the last ~2 ms"""
+    remaining = deadline - time.perf_counter()
+    if remaining > 0.002:
+        time.sleep(remaining - 0.002)
+    while time.perf_counter() < deadline:
+        time.sleep(0)
+
+
+# Newest text handed to the background typing worker; every Windows input
+# path waits on it so mouse and clipboard actions can't land mid-text
+_typing_future: Optional[Future] = None
+
+
+def _wait_typing(timeout: Optional[float] = None) -> bool:
+    """Wait for queued text to finish so later input events stay in order"""
+    future = _typing_future
+    if future is None:
+        return True
+    # The queue is FIFO, so the newest future completes last
+    return not wait([future], timeout).not_done
 
 
 class KeyboardController:
@@ -98,56 +304,93 @@ class KeyboardController:
     
     def __init__(self):
         self._typing_delay = 0.02  # Delay between keystrokes
+        
+        # Background typing; the worker is started on first non-blocking use
+        self._typing_queue: queue.Queue = queue.Queue()
+        self._typing_worker: Optional[threading.Thread] = None
+        
+        # Bind the Windows implementations over the dispatching methods so
+        # each call skips the platform check
+        if IS_WINDOWS:
+            self.press_key = self._press_key_windows
+            self.press_hotkey = self._press_hotkey_windows
+            self.press_hotkey_sequence = self._press_hotkey_sequence_windows
+            self.hold_key = self._hold_key_windows
     
     def type_text(
         self,
         text: str,
         interval: float = 0.02,
+        blocking: bool = True,
     ) -> Dict[str, Any]:
-        """Type text character by character"""
+        """Type text character by character, or queue it when blocking is False"""
         if IS_WINDOWS:
-            return self._type_text_windows(text, interval)
+            if blocking:
+                _wait_typing()
+                return self._type_text_windows(text, interval)
+            return self._queue_typing(text, interval)
         else:
             return self._type_text_mock(text)
     
+    def _queue_typing(self, text: str, interval: float) -> Dict[str, Any]:
+        """Hand text to the background typing worker and return immediately"""
+        if self._typing_worker is None:
+            self._typing_worker = threading.Thread(
+                target=self._typing_pump, name="keyboard-typing", daemon=True
+            )
+            self._typing_worker.start()
+        
+        global _typing_future
+        future = Future()
+        _typing_future = future
+        self._typing_queue.put((text, interval, future))
+        
+        return {
+            "result": {
+                "queued": True,
+                "text": text,
+                "length": len(text),
+            }
+        }
+    
+    def _typing_pump(self):
+        """Worker loop typing queued text in order"""
+        while True:
+            text, interval, future = self._typing_queue.get()
+            try:
+                if future.set_running_or_notify_cancel():
+                    future.set_result(self._type_text_windows(text, interval))
+            except Exception as e:
+                logger.error(f"Background typing failed: {e}")
+                future.set_exception(e)
+    
     def _type_text_windows(self, text: str, interval: float) -> Dict[str, Any]:
         """Type text using Windows SendInput"""
-        user32 = ctypes.windll.user32
+        input_size = ctypes.sizeof(INPUT)
         
-        for char in text:
-            # Create key down event
-            inputs = []
-            
-            # Use unicode input for most characters
-            ki_down = KEYBDINPUT(
-                wVk=0,
-                wScan=ord(char),
-                dwFlags=KEYEVENTF_UNICODE,
-                time=0,
-                dwExtraInfo=None,
-            )
-            input_down = INPUT(type=INPUT_KEYBOARD)
-            input_down.ki = ki_down
-            inputs.append(input_down)
-            
-            # Key up
-            ki_up = KEYBDINPUT(
-                wVk=0,
-                wScan=ord(char),
-                dwFlags=KEYEVENTF_UNICODE | KEYEVENTF_KEYUP,
-                time=0,
-                dwExtraInfo=None,
-            )
-            input_up = INPUT(type=INPUT_KEYBOARD)
-            input_up.ki = ki_up
-            inputs.append(input_up)
-            
-            # Send inputs
-            array = (INPUT * len(inputs))(*inputs)
-            user32.SendInput(len(inputs), array, ctypes.sizeof(INPUT))
+        # KEYEVENTF_UNICODE takes UTF-16 code units, so characters outside
+        # the BMP are sent as their surrogate pair
+        units = memoryview(text.encode('utf-16-le')).cast('H')
+        
+        if interval > 0:
+            # Paced: reuse the module-level pair, one SendInput per unit
+            down, up = _TYPE_PAIR
+            with _ThreadPriorityBoost():
+                for unit in units:
+                    down.ki.wScan = up.ki.wScan = unit
+                    _SendInput(2, _TYPE_PAIR, input_size)
+                    # Don't split a surrogate pair with a delay
+                    if not 0xD800 <= unit <= 0xDBFF:
+                        time.sleep(interval)
+        elif units:
+            # Unpaced: one buffer with a down/up pair per unit, one call
+            n_inputs = 2 * len(units)
+            events = []
+            for unit in units:
+                events.append((0, unit, KEYEVENTF_UNICODE))
+                events.append((0, unit, KEYEVENTF_UNICODE | KEYEVENTF_KEYUP))
             
-            if interval > 0:
-                time.sleep(interval)
+            _SendInput(n_inputs, _pack_keys(events), input_size)
         
         return {
             "result": {
@@ -178,20 +421,13 @@ class KeyboardController:
     
     def _press_key_windows(self, key: str) -> Dict[str, Any]:
         """Press key on Windows"""
-        user32 = ctypes.windll.user32
-        
-        vk = VK_CODES.get(key.lower())
+        _wait_typing()
+        vk = _vk_for(key)
         if vk is None:
-            # Try as single character
-            if len(key) == 1:
-                vk = ord(key.upper())
-            else:
-                return {"error": f"Unknown key: {key}"}
+            return {"error": f"Unknown key: {key}"}
         
-        # Key down
-        user32.keybd_event(vk, 0, 0, 0)
-        # Key up
-        user32.keybd_event(vk, 0, KEYEVENTF_KEYUP, 0)
+        # Key down and up
+        _send_keys([(vk, 0), (vk, KEYEVENTF_KEYUP)])
         
         return {"result": {"pressed": True, "key": key}}
     
@@ -204,47 +440,85 @@ class KeyboardController:
     
     def _press_hotkey_windows(self, keys: List[str]) -> Dict[str, Any]:
         """Press hotkey on Windows"""
-        user32 = ctypes.windll.user32
+        _wait_typing()
+        events = []
+        error = self._chord_events(keys, events)
+        if error:
+            return error
+        
+        # One SendInput queues the whole chord atomically so no delay is needed
+        _send_keys(events)
         
+        return {"result": {"pressed": True, "keys": keys}}
+    
+    def _chord_events(self, keys: List[str], events: List[Tuple[int, int]]) -> Optional[Dict[str, Any]]:
+        """Append a chord's key events to events; returns an error dict for unknown keys"""
         # Get virtual key codes
         vk_codes = []
         for key in keys:
-            vk = VK_CODES.get(key.lower())
+            vk = _vk_for(key)
             if vk is None:
-                if len(key) == 1:
-                    vk = ord(key.upper())
-                else:
-                    return {"error": f"Unknown key: {key}"}
+                return {"error": f"Unknown key: {key}"}
             vk_codes.append(vk)
         
-        # Press all keys down
-        for vk in vk_codes:
-            user32.keybd_event(vk, 0, 0, 0)
-        
-        time.sleep(0.05)
+        # Press all keys down, then release them in reverse order
+        events.extend((vk, 0) for vk in vk_codes)
+        events.extend((vk, KEYEVENTF_KEYUP) for vk in reversed(vk_codes))
+        return None
+    
+    def press_hotkey_sequence(
+        self,
+        sequences: List[List[str]],
+        gap: float = 0,
+    ) -> Dict[str, Any]:
+        """Press several hotkeys in order (e.g., [['ctrl', 'a'], ['ctrl', 'c']])"""
+        if IS_WINDOWS:
+            return self._press_hotkey_sequence_windows(sequences, gap)
+        else:
+            return {"result": {"pressed": True, "sequences": sequences, "note": "Mock"}}
+    
+    def _press_hotkey_sequence_windows(self, sequences: List[List[str]], gap: float = 0) -> Dict[str, Any]:
+        """Press hotkey sequence on Windows, in one SendInput unless a gap is set"""
+        _wait_typing()
+        chords = []
+        for keys in sequences:
+            events = []
+            error = self._chord_events(keys, events)
+            if error:
+                return error
+            chords.append(events)
         
-        # Release all keys (in reverse order)
-        for vk in reversed(vk_codes):
-            user32.keybd_event(vk, 0, KEYEVENTF_KEYUP, 0)
+        if gap > 0:
+            # Some apps need time to react between shortcuts
+            for i, events in enumerate(chords):
+                if i:
+                    time.sleep(gap)
+                _send_keys(events)
+        elif chords:
+            _send_keys([event for events in chords for event in events])
         
-        return {"result": {"pressed": True, "keys": keys}}
+        return {"result": {"pressed": True, "sequences": sequences}}
     
     def hold_key(self, key: str, duration: float = 0.5) -> Dict[str, Any]:
         """Hold a key for a duration"""
         if IS_WINDOWS:
-            user32 = ctypes.windll.user32
-            vk = VK_CODES.get(key.lower(), ord(key.upper()) if len(key) == 1 else None)
-            
-            if vk is None:
-                return {"error": f"Unknown key: {key}"}
-            
-            user32.keybd_event(vk, 0, 0, 0)
-            time.sleep(duration)
-            user32.keybd_event(vk, 0, KEYEVENTF_KEYUP, 0)
-            
-            return {"result": {"held": True, "key": key, "duration": duration}}
+            return self._hold_key_windows(key, duration)
         
         return {"result": {"held": True, "key": key, "note": "Mock"}}
+    
+    def _hold_key_windows(self, key: str, duration: float = 0.5) -> Dict[str, Any]:
+        """Hold key on Windows"""
+        _wait_typing()
+        vk = _vk_for(key)
+        
+        if vk is None:
+            return {"error": f"Unknown key: {key}"}
+        
+        _send_keys([(vk, 0)])
+        time.sleep(duration)
+        _send_keys([(vk, KEYEVENTF_KEYUP)])
+        
+        return {"result": {"held": True, "key": key, "duration": duration}}
 
 
 class MouseController:
@@ -257,23 +531,41 @@ class MouseController:
         self._screen_width = 1920
         self._screen_height = 1080
         
+        self._timer_period = False
+        
         if IS_WINDOWS:
-            user32 = ctypes.windll.user32
-            self._screen_width = user32.GetSystemMetrics(0)
-            self._screen_height = user32.GetSystemMetrics(1)
+            self._pt = POINT()  # Reused by get_position
+            self._screen_width = _GetSystemMetrics(0)
+            self._screen_height = _GetSystemMetrics(1)
+            # 1 ms scheduler tick instead of the default 15.6 ms, so
+            # smooth-move steps land on time
+            self._timer_period = _timeBeginPeriod(1) == 0  # TIMERR_NOERROR
+            
+            # Bind the Windows implementations over the dispatching methods
+            # so each call skips the platform check
+            self.get_position = self._get_position_windows
+            self.move_to = self._move_to_windows
+            self.click = self._click_windows
+            self.drag = self._drag_windows
+            self.scroll = self._scroll_windows
+    
+    def __del__(self):
+        if self._timer_period:
+            _timeEndPeriod(1)
     
     def get_position(self) -> Dict[str, Any]:
         """Get current mouse position"""
         if IS_WINDOWS:
-            class POINT(ctypes.Structure):
-                _fields_ = [("x", wintypes.LONG), ("y", wintypes.LONG)]
-            
-            pt = POINT()
-            ctypes.windll.user32.GetCursorPos(ctypes.byref(pt))
-            return {"result": {"x": pt.x, "y": pt.y}}
+            return self._get_position_windows()
         
         return {"result": {"x": 0, "y": 0, "note": "Mock"}}
     
+    def _get_position_windows(self) -> Dict[str, Any]:
+        """Get mouse position on Windows"""
+        pt = self._pt
+        _GetCursorPos(ctypes.byref(pt))
+        return {"result": {"x": pt.x, "y": pt.y}}
+    
     def move_to(
         self,
         x: int,
@@ -286,53 +578,117 @@ class MouseController:
         else:
             return {"result": {"moved": True, "x": x, "y": y, "note": "Mock"}}
     
-    def _move_to_windows(self, x: int, y: int, duration: float) -> Dict[str, Any]:
+    def _move_to_windows(self, x: int, y: int, duration: float = 0) -> Dict[str, Any]:
         """Move mouse on Windows"""
-        user32 = ctypes.windll.user32
-        
+        _wait_typing()
         if duration > 0:
             # Smooth movement
             pos = self.get_position()["result"]
-            start_x, start_y = pos["x"], pos["y"]
-            steps = int(duration * 60)  # 60 steps per second
-            
-            for i in range(steps + 1):
-                progress = i / steps
-                curr_x = int(start_x + (x - start_x) * progress)
-                curr_y = int(start_y + (y - start_y) * progress)
-                user32.SetCursorPos(curr_x, curr_y)
-                time.sleep(duration / steps)
+            self._send_trajectory(pos["x"], pos["y"], x, y, duration)
         else:
-            user32.SetCursorPos(x, y)
+            _SetCursorPos(x, y)
         
         return {"result": {"moved": True, "x": x, "y": y}}
     
+    def _send_trajectory(
+        self,
+        start_x: int,
+        start_y: int,
+        end_x: int,
+        end_y: int,
+        duration: float,
+        down_flag: int = 0,
+        up_flag: int = 0,
+    ):
+        """Move in a line via absolute SendInput moves, with optional button down/up"""
+        steps = max(1, int(duration * 60))  # 60 steps per second
+        
+        # Absolute coordinates are normalized to 0..65535 over the whole
+        # virtual desktop, which may start left of or above the primary
+        # monitor; read per call so monitor changes are picked up
+        left = _GetSystemMetrics(SM_XVIRTUALSCREEN)
+        top = _GetSystemMetrics(SM_YVIRTUALSCREEN)
+        scale_x = 65535 / max(1, _GetSystemMetrics(SM_CXVIRTUALSCREEN) - 1)
+        scale_y = 65535 / max(1, _GetSystemMetrics(SM_CYVIRTUALSCREEN) - 1)
+        move_flags = MOUSEEVENTF_MOVE | MOUSEEVENTF_ABSOLUTE | MOUSEEVENTF_VIRTUALDESK
+        
+        # type is left at 0 (INPUT_MOUSE) by zero-initialization
+        np = _get_numpy()
+        if np is not None:
+            # Compute the whole path at once and write the dx/dy/dwFlags
+            # lanes through a byte view aliasing the INPUT array
+            inputs = (INPUT * (steps + 1))()
+            lanes = np.frombuffer(inputs, dtype=np.uint8).reshape(steps + 1, -1)
+            ts = np.linspace(0.0, 1.0, steps + 1)
+            xs = ((start_x + (end_x - start_x) * ts).astype(np.int32) - left) * scale_x
+            ys = ((start_y + (end_y - start_y) * ts).astype(np.int32) - top) * scale_y
+            for offset, values in (
+                (_DX_OFFSET, xs.astype('<i4')),
+                (_DY_OFFSET, ys.astype('<i4')),
+                (_MI_FLAGS_OFFSET, np.full(steps + 1, move_flags, '<u4')),
+            ):
+                lanes[:, offset:offset + 4] = values.view(np.uint8).reshape(-1, 4)
+        else:
+            # Pack each lane as a C int array and stride its bytes into a
+            # zeroed block, then alias the block as the INPUT array
+            dx, dy = end_x - start_x, end_y - start_y
+            xs = array.array('i', (int((int(start_x + dx * i / steps) - left) * scale_x) for i in range(steps + 1)))
+            ys = array.array('i', (int((int(start_y + dy * i / steps) - top) * scale_y) for i in range(steps + 1)))
+            flags = array.array('I', [move_flags]) * (steps + 1)
+            
+            stride = ctypes.sizeof(INPUT)
+            block = bytearray(stride * (steps + 1))
+            for offset, values in ((_DX_OFFSET, xs), (_DY_OFFSET, ys), (_MI_FLAGS_OFFSET, flags)):
+                raw = values.tobytes()
+                for b in range(4):
+                    block[offset + b::stride] = raw[b::4]
+            inputs = (INPUT * (steps + 1)).from_buffer(block)
+        inputs[0].mi.dwFlags |= down_flag
+        inputs[steps].mi.dwFlags |= up_flag
+        
+        input_size = ctypes.sizeof(INPUT)
+        if duration <= 0:
+            _SendInput(steps + 1, inputs, input_size)
+            return
+        
+        # Pace against absolute deadlines so per-step error can't accumulate;
+        # sleeping before each send means nothing waits after the last one
+        step_time = duration / steps
+        with _ThreadPriorityBoost():
+            t0 = time.perf_counter()
+            for i in range(steps + 1):
+                _sleep_until(t0 + i * step_time)
+                _SendInput(1, inputs[i], input_size)
+    
     def click(
         self,
         x: int = None,
         y: int = None,
         button: str = "left",
         clicks: int = 1,
+        press_release_gap: float = 0,
+        return_position: bool = False,
     ) -> Dict[str, Any]:
         """Click at position (or current position if x,y not specified)"""
         if IS_WINDOWS:
-            return self._click_windows(x, y, button, clicks)
+            return self._click_windows(x, y, button, clicks, press_release_gap, return_position)
         else:
             return {"result": {"clicked": True, "button": button, "note": "Mock"}}
     
     def _click_windows(
         self,
-        x: int,
-        y: int,
-        button: str,
-        clicks: int,
+        x: int = None,
+        y: int = None,
+        button: str = "left",
+        clicks: int = 1,
+        press_release_gap: float = 0,
+        return_position: bool = False,
     ) -> Dict[str, Any]:
         """Click on Windows"""
-        user32 = ctypes.windll.user32
-        
+        _wait_typing()
         # Move to position if specified
         if x is not None and y is not None:
-            user32.SetCursorPos(x, y)
+            _SetCursorPos(x, y)
         
         # Determine button flags
         if button == "left":
@@ -347,24 +703,30 @@ class MouseController:
         else:
             return {"error": f"Unknown button: {button}"}
         
-        # Perform clicks
-        for _ in range(clicks):
-            user32.mouse_event(down_flag, 0, 0, 0, 0)
-            time.sleep(0.01)
-            user32.mouse_event(up_flag, 0, 0, 0, 0)
-            if clicks > 1:
-                time.sleep(0.1)
+        # Perform clicks; without a gap every down/up goes in one call
+        if press_release_gap > 0:
+            for _ in range(clicks):
+                _send_mouse([(down_flag, 0)])
+                time.sleep(press_release_gap)
+                _send_mouse([(up_flag, 0)])
+        else:
+            _send_mouse([(down_flag, 0), (up_flag, 0)] * clicks)
         
-        pos = self.get_position()["result"]
-        return {
-            "result": {
-                "clicked": True,
-                "x": pos["x"],
-                "y": pos["y"],
-                "button": button,
-                "clicks": clicks,
-            }
+        result = {
+            "clicked": True,
+            "button": button,
+            "clicks": clicks,
         }
+        
+        # Echo the requested coordinates; only query the cursor (which may
+        # not yet reflect the injected input) when asked to
+        if x is not None and y is not None:
+            result["x"], result["y"] = x, y
+        elif return_position:
+            pos = self.get_position()["result"]
+            result["x"], result["y"] = pos["x"], pos["y"]
+        
+        return {"result": result}
     
     def double_click(self, x: int = None, y: int = None) -> Dict[str, Any]:
         """Double-click at position"""
@@ -395,12 +757,11 @@ class MouseController:
         start_y: int,
         end_x: int,
         end_y: int,
-        duration: float,
-        button: str,
+        duration: float = 0.5,
+        button: str = "left",
     ) -> Dict[str, Any]:
         """Drag on Windows"""
-        user32 = ctypes.windll.user32
-        
+        _wait_typing()
         # Determine button flags
         if button == "left":
             down_flag = MOUSEEVENTF_LEFTDOWN
@@ -411,24 +772,9 @@ class MouseController:
         else:
             return {"error": f"Unknown button: {button}"}
         
-        # Move to start
-        user32.SetCursorPos(start_x, start_y)
-        time.sleep(0.05)
-        
-        # Press button
-        user32.mouse_event(down_flag, 0, 0, 0, 0)
-        
-        # Smooth movement to end
-        steps = int(duration * 60)
-        for i in range(steps + 1):
-            progress = i / steps
-            curr_x = int(start_x + (end_x - start_x) * progress)
-            curr_y = int(start_y + (end_y - start_y) * progress)
-            user32.SetCursorPos(curr_x, curr_y)
-            time.sleep(duration / steps)
-        
-        # Release button
-        user32.mouse_event(up_flag, 0, 0, 0, 0)
+        # Press at the start, move to the end and release, all through the
+        # input queue so the button and moves stay in order
+        self._send_trajectory(start_x, start_y, end_x, end_y, duration, down_flag, up_flag)
         
         return {
             "result": {
@@ -444,20 +790,38 @@ class MouseController:
         clicks: int,
         x: int = None,
         y: int = None,
+        split: int = 1,
     ) -> Dict[str, Any]:
-        """Scroll wheel (positive = up, negative = down)"""
+        """Scroll wheel (positive = up, negative = down), optionally as split wheel events"""
         if IS_WINDOWS:
-            user32 = ctypes.windll.user32
-            
-            if x is not None and y is not None:
-                user32.SetCursorPos(x, y)
-            
-            # WHEEL_DELTA = 120
-            user32.mouse_event(MOUSEEVENTF_WHEEL, 0, 0, clicks * 120, 0)
-            
-            return {"result": {"scrolled": True, "clicks": clicks}}
+            return self._scroll_windows(clicks, x, y, split)
         
         return {"result": {"scrolled": True, "clicks": clicks, "note": "Mock"}}
+    
+    def _scroll_windows(
+        self,
+        clicks: int,
+        x: int = None,
+        y: int = None,
+        split: int = 1,
+    ) -> Dict[str, Any]:
+        """Scroll on Windows"""
+        _wait_typing()
+        if x is not None and y is not None:
+            _SetCursorPos(x, y)
+        
+        # Spread the clicks over up to `split` wheel events (for apps that
+        # cap the delta per message), all queued by one SendInput;
+        # WHEEL_DELTA = 120
+        parts = max(1, min(split, abs(clicks)))
+        step, extra = divmod(abs(clicks), parts)
+        sign = -1 if clicks < 0 else 1
+        _send_mouse([
+            (MOUSEEVENTF_WHEEL, sign * (step + (i < extra)) * 120)
+            for i in range(parts)
+        ])
+        
+        return {"result": {"scrolled": True, "clicks": clicks}}
 
 
 class ClipboardController:
@@ -466,24 +830,53 @@ class ClipboardController:
     Manages clipboard operations
     """
     
+    def __init__(self):
+        self._batch_depth = 0  # Clipboard is held open while > 0
+    
+    @contextmanager
+    def batch(self):
+        """Hold the clipboard open across several operations"""
+        if IS_WINDOWS and self._batch_depth == 0:
+            _wait_typing()
+            if not _OpenClipboard(0):
+                raise OSError("Failed to open clipboard")
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if IS_WINDOWS and self._batch_depth == 0:
+                _CloseClipboard()
+    
+    def _open(self):
+        """Open the clipboard unless a batch already holds it"""
+        if not self._batch_depth:
+            _wait_typing()
+            _OpenClipboard(0)
+    
+    def _close(self):
+        """Close the clipboard unless a batch holds it"""
+        if not self._batch_depth:
+            _CloseClipboard()
+    
     def get_text(self) -> Dict[str, Any]:
         """Get text from clipboard"""
         if IS_WINDOWS:
-            import ctypes
-            
-            user32 = ctypes.windll.user32
-            kernel32 = ctypes.windll.kernel32
-            
-            user32.OpenClipboard(0)
+            self._open()
             try:
-                if user32.IsClipboardFormatAvailable(1):  # CF_TEXT
-                    data = user32.GetClipboardData(13)  # CF_UNICODETEXT
+                if _IsClipboardFormatAvailable(CF_UNICODETEXT):
+                    handle = _GetClipboardData(CF_UNICODETEXT)
+                    # The handle is an HGLOBAL; lock it to get the text
+                    data = _GlobalLock(handle) if handle else None
                     if data:
-                        text = ctypes.c_wchar_p(data).value
+                        try:
+                            text = ctypes.c_wchar_p(data).value
+                        finally:
+                            _GlobalUnlock(handle)
                         return {"result": {"text": text}}
                 return {"result": {"text": ""}}
             finally:
-                user32.CloseClipboard()
+                self._close()
         
         # Try pyperclip or xclip on Linux
         try:
@@ -497,26 +890,26 @@ class ClipboardController:
     def set_text(self, text: str) -> Dict[str, Any]:
         """Set text to clipboard"""
         if IS_WINDOWS:
-            import ctypes
-            
-            user32 = ctypes.windll.user32
-            kernel32 = ctypes.windll.kernel32
-            
-            user32.OpenClipboard(0)
+            self._open()
             try:
-                user32.EmptyClipboard()
+                _EmptyClipboard()
+                
+                # One C-level UTF-16 encode; the zero-initialized extra
+                # two bytes are the terminating NUL
+                data = text.encode('utf-16-le')
                 
-                # Allocate global memory
-                hMem = kernel32.GlobalAlloc(0x0042, (len(text) + 1) * 2)  # GMEM_MOVEABLE | GMEM_ZEROINIT
-                pMem = kernel32.GlobalLock(hMem)
-                ctypes.memmove(pMem, text.encode('utf-16-le'), len(text) * 2)
-                kernel32.GlobalUnlock(hMem)
+                hMem = _GlobalAlloc(GMEM_MOVEABLE | GMEM_ZEROINIT, len(data) + 2)
+                if not hMem:
+                    return {"error": "Failed to allocate clipboard memory"}
+                pMem = _GlobalLock(hMem)
+                ctypes.memmove(pMem, data, len(data))
+                _GlobalUnlock(hMem)
                 
-                user32.SetClipboardData(13, hMem)  # CF_UNICODETEXT
+                _SetClipboardData(CF_UNICODETEXT, hMem)
                 
                 return {"result": {"set": True, "length": len(text)}}
             finally:
-                user32.CloseClipboard()
+                self._close()
         
         # Try xclip on Linux
         try:
@@ -530,11 +923,9 @@ class ClipboardController:
     def clear(self) -> Dict[str, Any]:
         """Clear clipboard"""
         if IS_WINDOWS:
-            import ctypes
-            user32 = ctypes.windll.user32
-            user32.OpenClipboard(0)
-            user32.EmptyClipboard()
-            user32.CloseClipboard()
+            self._open()
+            _EmptyClipboard()
+            self._close()
             return {"result": {"cleared": True}}
         
         return self.set_text("")
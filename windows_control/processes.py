@@ -4,9 +4,12 @@ Handles process management and application launching
 """
 import os
 import sys
+import time
+import shutil
 import subprocess
 import logging
-from typing import Dict, List, Optional, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Any
 from dataclasses import dataclass
 import json
 
@@ -24,12 +27,132 @@ if IS_WINDOWS:
     except ImportError:
         HAS_PSUTIL = False
         logger.warning("psutil not installed, some features limited")
+    
+    # Native process snapshot: NtQuerySystemInformation returns every
+    # process in one call, without opening a handle per process
+    SystemProcessInformation = 5
+    STATUS_INFO_LENGTH_MISMATCH = 0xC0000004
+    
+    class UNICODE_STRING(ctypes.Structure):
+        _fields_ = [
+            ("Length", wintypes.USHORT),
+            ("MaximumLength", wintypes.USHORT),
+            ("Buffer", ctypes.c_void_p),
+        ]
+    
+    class SYSTEM_PROCESS_INFORMATION(ctypes.Structure):
+        # Leading fields only; records are walked via NextEntryOffset
+        _fields_ = [
+            ("NextEntryOffset", wintypes.ULONG),
+            ("NumberOfThreads", wintypes.ULONG),
+            ("WorkingSetPrivateSize", ctypes.c_longlong),
+            ("HardFaultCount", wintypes.ULONG),
+            ("NumberOfThreadsHighWatermark", wintypes.ULONG),
+            ("CycleTime", ctypes.c_ulonglong),
+            ("CreateTime", ctypes.c_longlong),
+            ("UserTime", ctypes.c_longlong),
+            ("KernelTime", ctypes.c_longlong),
+            ("ImageName", UNICODE_STRING),
+            ("BasePriority", wintypes.LONG),
+            ("UniqueProcessId", ctypes.c_void_p),
+            ("InheritedFromUniqueProcessId", ctypes.c_void_p),
+            ("HandleCount", wintypes.ULONG),
+            ("SessionId", wintypes.ULONG),
+            ("UniqueProcessKey", ctypes.c_size_t),
+            ("PeakVirtualSize", ctypes.c_size_t),
+            ("VirtualSize", ctypes.c_size_t),
+            ("PageFaultCount", wintypes.ULONG),
+            ("PeakWorkingSetSize", ctypes.c_size_t),
+            ("WorkingSetSize", ctypes.c_size_t),
+        ]
+    
+    _NtQuerySystemInformation = ctypes.WinDLL('ntdll').NtQuerySystemInformation
+    _NtQuerySystemInformation.argtypes = [
+        wintypes.ULONG, ctypes.c_void_p, wintypes.ULONG, ctypes.POINTER(wintypes.ULONG)
+    ]
+    _NtQuerySystemInformation.restype = wintypes.LONG
+    
+    def _query_process_snapshot():
+        """Return a buffer of SYSTEM_PROCESS_INFORMATION records for all processes"""
+        size = 512 * 1024
+        needed = wintypes.ULONG()
+        while True:
+            buf = ctypes.create_string_buffer(size)
+            status = _NtQuerySystemInformation(
+                SystemProcessInformation, buf, size, ctypes.byref(needed)
+            ) & 0xFFFFFFFF
+            if status == STATUS_INFO_LENGTH_MISMATCH:
+                # Processes may start between calls, so leave headroom
+                size = max(size * 2, needed.value + 64 * 1024)
+                continue
+            if status:
+                raise OSError(f"NtQuerySystemInformation failed: 0x{status:08X}")
+            return buf
+    
+    def _iter_process_snapshot():
+        """Yield (pid, name, record) for every process in one snapshot"""
+        buf = _query_process_snapshot()
+        offset = 0
+        while True:
+            entry = SYSTEM_PROCESS_INFORMATION.from_buffer(buf, offset)
+            image = entry.ImageName
+            if image.Buffer:
+                name = ctypes.string_at(image.Buffer, image.Length).decode('utf-16-le', 'replace')
+            else:
+                name = "System Idle Process"
+            yield entry.UniqueProcessId or 0, name, entry
+            
+            if not entry.NextEntryOffset:
+                break
+            offset += entry.NextEntryOffset
+    
+    def _filetime_to_epoch(filetime: int) -> float:
+        """Convert a FILETIME (100 ns ticks since 1601) to Unix seconds"""
+        return (filetime - 116444736000000000) / 10_000_000
+    
+    # Window and shell functions, bound once at import instead of being
+    # looked up through ctypes.windll on every call
+    _user32 = ctypes.WinDLL('user32', use_last_error=True)
+    _shell32 = ctypes.WinDLL('shell32', use_last_error=True)
+    
+    def _bind(dll, name, argtypes, restype):
+        func = getattr(dll, name)
+        func.argtypes = argtypes
+        func.restype = restype
+        return func
+    
+    _WNDENUMPROC = ctypes.WINFUNCTYPE(wintypes.BOOL, wintypes.HWND, wintypes.LPARAM)
+    
+    _EnumWindows = _bind(_user32, 'EnumWindows', [_WNDENUMPROC, wintypes.LPARAM], wintypes.BOOL)
+    _IsWindowVisible = _bind(_user32, 'IsWindowVisible', [wintypes.HWND], wintypes.BOOL)
+    _GetWindowTextLengthW = _bind(_user32, 'GetWindowTextLengthW', [wintypes.HWND], ctypes.c_int)
+    _GetWindowTextW = _bind(_user32, 'GetWindowTextW',
+                            [wintypes.HWND, wintypes.LPWSTR, ctypes.c_int], ctypes.c_int)
+    _GetWindowThreadProcessId = _bind(_user32, 'GetWindowThreadProcessId',
+                                      [wintypes.HWND, ctypes.POINTER(wintypes.DWORD)], wintypes.DWORD)
+    _GetWindowRect = _bind(_user32, 'GetWindowRect',
+                           [wintypes.HWND, ctypes.POINTER(wintypes.RECT)], wintypes.BOOL)
+    _FindWindowW = _bind(_user32, 'FindWindowW', [wintypes.LPCWSTR, wintypes.LPCWSTR], wintypes.HWND)
+    _SetForegroundWindow = _bind(_user32, 'SetForegroundWindow', [wintypes.HWND], wintypes.BOOL)
+    _ShowWindow = _bind(_user32, 'ShowWindow', [wintypes.HWND, ctypes.c_int], wintypes.BOOL)
+    _PostMessageW = _bind(_user32, 'PostMessageW',
+                          [wintypes.HWND, wintypes.UINT, wintypes.WPARAM, wintypes.LPARAM], wintypes.BOOL)
+    _ShellExecuteW = _bind(_shell32, 'ShellExecuteW',
+                           [wintypes.HWND, wintypes.LPCWSTR, wintypes.LPCWSTR, wintypes.LPCWSTR,
+                            wintypes.LPCWSTR, ctypes.c_int], wintypes.HINSTANCE)
 else:
     HAS_PSUTIL = False
     logger.info("Running on non-Windows platform, using mock implementations")
 
 
-@dataclass
+# Bytes to megabytes; a power of two, so multiplying is exact
+_BYTES_TO_MB = 1 / (1024 * 1024)
+
+# Slotted records where supported (3.10+); list_processes may build thousands
+_DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(**_DATACLASS_SLOTS)
 class ProcessInfo:
     """Information about a process"""
     pid: int
@@ -59,100 +182,261 @@ class ProcessController:
     Manages Windows processes - list, start, stop, etc.
     """
     
+    # Fields list_processes can return, in output order
+    PROCESS_FIELDS = ("pid", "name", "exe", "status", "username", "memory_mb")
+    
     def __init__(self):
         self._process_cache: Dict[int, ProcessInfo] = {}
+        
+        # Last list_processes rows and total count, reused while callers
+        # poll within the TTL; each caller gets its own copies
+        self._list_ttl = 0.25
+        self._list_key = None
+        self._list_time = 0.0
+        self._list_rows: Optional[List[Dict[str, Any]]] = None
+        self._list_count = 0
+        
+        # Compiled ProcessInfo -> dict converters, keyed by field tuple
+        self._row_factories: Dict[tuple, Any] = {}
+        self._row_factory(self.PROCESS_FIELDS)
+    
+    def _row_factory(self, fields: tuple):
+        """Return a function building an output row with exactly these fields"""
+        factory = self._row_factories.get(fields)
+        if factory is None:
+            # A fixed dict display runs fewer bytecodes per row than a
+            # comprehension over getattr. Names come from PROCESS_FIELDS only
+            body = ", ".join(f"{f!r}: info.{f}" for f in fields)
+            namespace: Dict[str, Any] = {}
+            exec(f"def row(info):\n    return {{{body}}}\n", namespace)
+            factory = self._row_factories[fields] = namespace["row"]
+        return factory
+    
+    def invalidate(self):
+        """Drop the cached process list, e.g. after starting or killing a process"""
+        self._list_key = None
+        self._list_rows = None
     
     def list_processes(
         self,
         filter_name: str = None,
         include_system: bool = False,
+        detailed: bool = True,
+        fields: List[str] = None,
+        include_memory: bool = False,
     ) -> Dict[str, Any]:
-        """List running processes"""
-        if IS_WINDOWS and HAS_PSUTIL:
-            return self._list_processes_windows(filter_name, include_system)
+        """List running processes; pass include_memory=True to sort or filter on memory_mb"""
+        if fields is not None:
+            unknown = set(fields) - set(self.PROCESS_FIELDS)
+            if unknown:
+                return {"error": f"Unknown process fields: {', '.join(sorted(unknown))}"}
+            fields = tuple(f for f in self.PROCESS_FIELDS if f in fields)
+        
+        key = (filter_name, include_system, detailed, fields, include_memory)
+        now = time.monotonic()
+        if key != self._list_key or now - self._list_time >= self._list_ttl:
+            row = self._row_factory(fields or self.PROCESS_FIELDS)
+            try:
+                rows = list(map(row, self.iter_processes(
+                    filter_name, include_system, detailed, fields, include_memory
+                )))
+            except Exception as e:
+                return {"error": str(e)}
+            
+            self._list_count = len(rows)
+            if not IS_WINDOWS:
+                rows = rows[:50]  # Limit results
+            self._list_key, self._list_time, self._list_rows = key, now, rows
+        
+        # Fresh list and row dicts, so a caller sorting or editing its
+        # result can't change what the next caller is handed
+        return {
+            "result": {
+                "processes": list(map(dict.copy, self._list_rows)),
+                "count": self._list_count,
+            }
+        }
+    
+    def iter_processes(
+        self,
+        filter_name: str = None,
+        include_system: bool = False,
+        detailed: bool = True,
+        fields: tuple = None,
+        include_memory: bool = False,
+    ) -> Iterator[ProcessInfo]:
+        """Yield ProcessInfo records one at a time; fields limits what is queried"""
+        # memory_mb stays 0.0 unless asked for, by flag or by naming the field
+        include_memory = include_memory or (fields is not None and "memory_mb" in fields)
+        if IS_WINDOWS and HAS_PSUTIL and detailed:
+            # Only the attributes behind the requested fields are queried
+            return self._iter_processes_windows(filter_name, include_system, fields, include_memory)
+        elif IS_WINDOWS:
+            return self._iter_processes_ntqsi(filter_name, include_system, include_memory)
+        elif os.path.isdir('/proc'):
+            return self._iter_processes_proc(filter_name, fields, include_memory)
         else:
-            return self._list_processes_mock(filter_name)
+            return self._iter_processes_ps(filter_name)
     
-    def _list_processes_windows(
+    def _iter_processes_windows(
         self,
         filter_name: str = None,
         include_system: bool = False,
-    ) -> Dict[str, Any]:
-        """List processes on Windows using psutil"""
+        fields: tuple = None,
+        include_memory: bool = False,
+    ) -> Iterator[ProcessInfo]:
+        """Iterate processes on Windows using psutil"""
         import psutil
         
-        processes = []
-        for proc in psutil.process_iter(['pid', 'name', 'exe', 'cmdline', 'status', 'username']):
+        wanted = fields or self.PROCESS_FIELDS
+        want_exe = "exe" in wanted
+        want_status = "status" in wanted
+        want_username = "username" in wanted
+        # memory_info costs its own OpenProcess per process; skip it by default
+        want_memory = include_memory and "memory_mb" in wanted
+        
+        # Every attribute costs a query per process, so only ask for what
+        # the output or the system filter needs. Requesting memory_info here
+        # fetches it in the same oneshot() batch instead of a second query
+        attrs = []
+        if want_exe:
+            attrs.append('exe')
+        if want_status:
+            attrs.append('status')
+        if want_username or not include_system:
+            attrs.append('username')
+        if want_memory:
+            attrs.append('memory_info')
+        
+        needle = filter_name.casefold() if filter_name else None
+        # process_iter() keeps its Process objects between calls, so a warm
+        # walk skips the create_time() lookup that psutil.Process(pid) makes
+        for proc in psutil.process_iter(['name']):
+            name = proc.info['name']  # None if access was denied
+            
+            # Filter by name before fetching anything else
+            if needle and needle not in (name or "").casefold():
+                continue
+            
             try:
-                info = proc.info
-                
-                # Filter by name if specified
-                if filter_name and filter_name.lower() not in info['name'].lower():
-                    continue
-                
-                # Skip system processes if not requested
-                if not include_system and info['username'] in ['SYSTEM', 'NT AUTHORITY\\SYSTEM']:
-                    continue
-                
-                try:
-                    memory_info = proc.memory_info()
-                    memory_mb = memory_info.rss / (1024 * 1024)
-                except:
-                    memory_mb = 0
-                
-                processes.append({
-                    "pid": info['pid'],
-                    "name": info['name'],
-                    "exe": info['exe'] or "",
-                    "status": info['status'],
-                    "username": info['username'] or "",
-                    "memory_mb": round(memory_mb, 2),
-                })
+                with proc.oneshot():
+                    # as_dict() treats an empty list as "everything"
+                    info = proc.as_dict(attrs, ad_value=None) if attrs else {}
             except (psutil.NoSuchProcess, psutil.AccessDenied):
                 continue
-        
-        return {
-            "result": {
-                "processes": processes,
-                "count": len(processes),
-            }
-        }
+            
+            # Skip system processes if not requested
+            if not include_system and info['username'] in ['SYSTEM', 'NT AUTHORITY\\SYSTEM']:
+                continue
+            
+            record = ProcessInfo(pid=proc.pid, name=name)
+            if want_exe:
+                record.exe = info['exe'] or ""
+            if want_status:
+                record.status = info['status']
+            if want_username:
+                record.username = info['username'] or ""
+            if want_memory:
+                memory_info = info['memory_info']  # None if access was denied
+                memory_mb = memory_info.rss * _BYTES_TO_MB if memory_info else 0
+                record.memory_mb = round(memory_mb, 2)
+            yield record
     
-    def _list_processes_mock(self, filter_name: str = None) -> Dict[str, Any]:
-        """Mock process list for non-Windows"""
-        # Use subprocess to get basic process info
-        try:
-            result = subprocess.run(['ps', 'aux'], capture_output=True, text=True)
-            lines = result.stdout.strip().split('\n')[1:]  # Skip header
+    def _iter_processes_ntqsi(
+        self,
+        filter_name: str = None,
+        include_system: bool = False,
+        include_memory: bool = False,
+    ) -> Iterator[ProcessInfo]:
+        """Iterate processes on Windows from a single NtQuerySystemInformation snapshot"""
+        needle = filter_name.casefold() if filter_name else None
+        for pid, name, entry in _iter_process_snapshot():
+            # Without a token lookup, session 0 stands in for system processes
+            if not include_system and entry.SessionId == 0:
+                continue
+            if needle and needle not in name.casefold():
+                continue
             
-            processes = []
-            for line in lines:
-                parts = line.split(None, 10)
-                if len(parts) >= 11:
-                    name = parts[10].split()[0] if parts[10] else ""
-                    if filter_name and filter_name.lower() not in name.lower():
-                        continue
-                    
-                    processes.append({
-                        "pid": int(parts[1]),
-                        "name": os.path.basename(name),
-                        "exe": name,
-                        "status": "running",
-                        "username": parts[0],
-                        "memory_mb": 0,
-                    })
+            record = ProcessInfo(pid=pid, name=name, status="running")
+            # Free in the snapshot, but gated like the other backends so
+            # output doesn't depend on which one served the call
+            if include_memory:
+                record.memory_mb = round(entry.WorkingSetSize * _BYTES_TO_MB, 2)
+            yield record
+    
+    def _iter_processes_ps(self, filter_name: str = None) -> Iterator[ProcessInfo]:
+        """Iterate processes from ps output, where /proc is unavailable"""
+        # Use subprocess to get basic process info
+        result = subprocess.run(['ps', 'aux'], capture_output=True, text=True)
+        lines = result.stdout.strip().split('\n')[1:]  # Skip header
+        
+        needle = filter_name.casefold() if filter_name else None
+        for line in lines:
+            parts = line.split(None, 10)
+            if len(parts) >= 11:
+                name = parts[10].split()[0] if parts[10] else ""
+                if needle and needle not in name.casefold():
+                    continue
+                
+                yield ProcessInfo(
+                    pid=int(parts[1]),
+                    name=os.path.basename(name),
+                    exe=name,
+                    status="running",
+                    username=parts[0],
+                )
+    
+    def _iter_processes_proc(
+        self,
+        filter_name: str = None,
+        fields: tuple = None,
+        include_memory: bool = False,
+    ) -> Iterator[ProcessInfo]:
+        """Iterate processes by reading /proc directly instead of forking ps"""
+        import pwd
+        
+        wanted = fields or self.PROCESS_FIELDS
+        want_exe = "exe" in wanted
+        want_username = "username" in wanted
+        want_memory = include_memory and "memory_mb" in wanted
+        page_mb = os.sysconf('SC_PAGE_SIZE') * _BYTES_TO_MB if want_memory else 0
+        users: Dict[int, str] = {}
+        
+        needle = filter_name.casefold() if filter_name else None
+        for entry in os.scandir('/proc'):
+            if not entry.name.isdigit():
+                continue
+            base = entry.path
+            try:
+                # comm is the short name the kernel keeps; tiny to read
+                with open(f"{base}/comm", 'rb') as f:
+                    name = f.read().rstrip(b'\n').decode(errors='replace')
+                if needle and needle not in name.casefold():
+                    continue
+                
+                record = ProcessInfo(pid=int(entry.name), name=name, status="running")
+                if want_exe:
+                    with open(f"{base}/cmdline", 'rb') as f:
+                        record.exe = f.read().split(b'\0', 1)[0].decode(errors='replace')
+                if want_username:
+                    uid = entry.stat().st_uid
+                    if uid not in users:
+                        try:
+                            users[uid] = pwd.getpwuid(uid).pw_name
+                        except KeyError:
+                            users[uid] = str(uid)
+                    record.username = users[uid]
+                if want_memory:
+                    # Second field of statm is resident pages
+                    with open(f"{base}/statm", 'rb') as f:
+                        record.memory_mb = round(int(f.read().split()[1]) * page_mb, 2)
+            except (OSError, ValueError, IndexError):
+                continue  # Process exited while being read
             
-            return {
-                "result": {
-                    "processes": processes[:50],  # Limit results
-                    "count": len(processes),
-                }
-            }
-        except Exception as e:
-            return {"error": str(e)}
+            yield record
     
-    def get_process_info(self, pid: int) -> Dict[str, Any]:
-        """Get detailed info about a specific process"""
+    def get_process_info(self, pid: int, memory_full: bool = False) -> Dict[str, Any]:
+        """Get detailed info about a specific process; memory_full adds a memory breakdown"""
         if IS_WINDOWS and HAS_PSUTIL:
             import psutil
             try:
@@ -163,33 +447,98 @@ class ProcessController:
                 ])
                 memory = proc.memory_info()
                 
-                return {
-                    "result": {
-                        "pid": info['pid'],
-                        "name": info['name'],
-                        "exe": info['exe'],
-                        "cmdline": ' '.join(info['cmdline'] or []),
-                        "status": info['status'],
-                        "username": info['username'],
-                        "memory_mb": round(memory.rss / (1024 * 1024), 2),
-                        "cpu_percent": info['cpu_percent'],
-                    }
+                result = {
+                    "pid": info['pid'],
+                    "name": info['name'],
+                    "exe": info['exe'],
+                    "cmdline": ' '.join(info['cmdline'] or []),
+                    "status": info['status'],
+                    "username": info['username'],
+                    "memory_mb": round(memory.rss * _BYTES_TO_MB, 2),
+                    "cpu_percent": info['cpu_percent'],
                 }
+                if memory_full:
+                    result["memory"] = {
+                        "rss_mb": round(memory.rss * _BYTES_TO_MB, 2),
+                        "vms_mb": round(memory.vms * _BYTES_TO_MB, 2),
+                    }
+                return {"result": result}
             except Exception as e:
                 return {"error": str(e)}
+        elif os.path.isdir('/proc'):
+            return self._get_process_info_proc(pid, memory_full)
         else:
             return {"error": "Process info not available on this platform"}
     
+    def _get_process_info_proc(self, pid: int, memory_full: bool = False) -> Dict[str, Any]:
+        """Get process info from /proc on Linux"""
+        import pwd
+        
+        base = f"/proc/{pid}"
+        try:
+            # status carries name, state, owner and resident size in one read
+            status = {}
+            with open(f"{base}/status", 'r', errors='replace') as f:
+                for line in f:
+                    key, _, value = line.partition(':')
+                    status[key] = value.strip()
+            with open(f"{base}/cmdline", 'rb') as f:
+                argv = [a.decode(errors='replace') for a in f.read().split(b'\0') if a]
+        except FileNotFoundError:
+            return {"error": f"Process not found: {pid}"}
+        except OSError as e:
+            return {"error": str(e)}
+        
+        uid = int(status.get('Uid', '0').split()[0])
+        try:
+            username = pwd.getpwuid(uid).pw_name
+        except KeyError:
+            username = str(uid)
+        rss_kb = int(status.get('VmRSS', '0 kB').split()[0])
+        
+        result = {
+            "pid": pid,
+            "name": status.get('Name', ''),
+            "exe": argv[0] if argv else "",
+            "cmdline": ' '.join(argv),
+            "status": status.get('State', ''),
+            "username": username,
+            "memory_mb": round(rss_kb / 1024, 2),
+            "cpu_percent": 0.0,
+        }
+        if memory_full:
+            result["memory"] = self._read_smaps_rollup(pid) or {"rss_mb": round(rss_kb / 1024, 2)}
+        return {"result": result}
+    
+    def _read_smaps_rollup(self, pid: int) -> Optional[Dict[str, float]]:
+        """Read RSS/PSS/swap totals from /proc/<pid>/smaps_rollup (Linux 4.14+)"""
+        # The kernel sums every mapping, so this is one small read instead
+        # of walking smaps, which is O(mappings)
+        fields = {"Rss": "rss_mb", "Pss": "pss_mb", "Swap": "swap_mb"}
+        totals = {}
+        try:
+            with open(f"/proc/{pid}/smaps_rollup", 'r') as f:
+                for line in f:
+                    key, _, value = line.partition(':')
+                    if key in fields:
+                        totals[fields[key]] = round(int(value.split()[0]) / 1024, 2)
+        except (OSError, ValueError, IndexError):
+            return None
+        return totals or None
+    
     def kill_process(
         self,
         pid: int = None,
         name: str = None,
         force: bool = False,
+        all_instances: bool = True,
     ) -> Dict[str, Any]:
-        """Kill a process by PID or name"""
+        """Kill a process by PID or name (every matching instance unless all_instances=False)"""
         if not pid and not name:
             return {"error": "Either pid or name must be specified"}
         
+        self.invalidate()
+        
         if IS_WINDOWS and HAS_PSUTIL:
             import psutil
             
@@ -215,18 +564,27 @@ class ProcessController:
                         }]
                     }
                 else:
-                    # Kill by name
+                    # Kill by name; names come from one native snapshot
+                    # rather than a psutil query per process
                     killed = []
-                    for proc in psutil.process_iter(['pid', 'name']):
-                        if proc.info['name'].lower() == name.lower():
-                            try:
-                                if force:
-                                    proc.kill()
-                                else:
-                                    proc.terminate()
-                                killed.append(proc.info['pid'])
-                            except:
-                                pass
+                    target = name.casefold()
+                    for proc_pid, proc_name, entry in _iter_process_snapshot():
+                        if proc_name.casefold() != target:
+                            continue
+                        try:
+                            proc = psutil.Process(proc_pid)
+                            # Skip a PID reused since the snapshot was taken
+                            if abs(proc.create_time() - _filetime_to_epoch(entry.CreateTime)) > 0.001:
+                                continue
+                            if force:
+                                proc.kill()
+                            else:
+                                proc.terminate()
+                            killed.append(proc_pid)
+                        except psutil.Error:
+                            continue
+                        if not all_instances:
+                            break
                     
                     return {
                         "result": {
@@ -245,7 +603,10 @@ class ProcessController:
                     os.kill(pid, 9 if force else 15)
                     return {"result": {"killed": True, "pid": pid}}
                 else:
-                    result = subprocess.run(['pkill', '-9' if force else '-15', name], capture_output=True)
+                    cmd = ['pkill', '-9' if force else '-15']
+                    if not all_instances:
+                        cmd.append('-o')  # Oldest match only
+                    result = subprocess.run(cmd + [name], capture_output=True)
                     return {"result": {"killed": result.returncode == 0, "name": name}}
             except Exception as e:
                 return {"error": str(e)}
@@ -271,6 +632,21 @@ class ApplicationController:
             "code": "code.exe",
             "vscode": "code.exe",
         }
+        
+        # Absolute paths of launched executables, resolved once via PATH
+        self._resolved_paths: Dict[str, str] = {}
+        
+        # Installed-app list cached on disk, tagged with the Uninstall keys'
+        # subkey counts and last-write times and trusted for at most the TTL
+        self._installed_ttl = 3600.0
+        self._installed_cache_path = os.path.join(
+            os.environ.get("LOCALAPPDATA") or os.path.expanduser("~"),
+            "WindowsAIAgent",
+            "installed_apps.json",
+        )
+        self._installed_cache: Optional[Dict[str, Any]] = None
+        if IS_WINDOWS:
+            self._installed_cache = self._load_installed_cache()
     
     def open_application(
         self,
@@ -286,6 +662,8 @@ class ApplicationController:
         # Resolve alias
         app_name = self.app_aliases.get(identifier.lower(), identifier)
         
+        get_process_controller().invalidate()
+        
         try:
             if IS_WINDOWS:
                 return self._open_app_windows(app_name, arguments, working_dir, wait, run_as_admin)
@@ -303,21 +681,24 @@ class ApplicationController:
         run_as_admin: bool,
     ) -> Dict[str, Any]:
         """Open application on Windows"""
-        import subprocess
-        
-        cmd = [app_name] + arguments
+        resolved = self._resolved_paths.get(app_name)
+        if resolved is None:
+            resolved = shutil.which(app_name)
+            if resolved:
+                self._resolved_paths[app_name] = resolved
         
         if run_as_admin:
             # Use ShellExecute with runas
-            import ctypes
-            result = ctypes.windll.shell32.ShellExecuteW(
+            result = _ShellExecuteW(
                 None,
                 "runas",
-                app_name,
+                resolved or app_name,
                 ' '.join(arguments),
                 working_dir,
                 1  # SW_SHOWNORMAL
             )
+            # The HINSTANCE is really a status code; > 32 means success
+            result = result or 0
             if result > 32:
                 return {
                     "result": {
@@ -329,14 +710,20 @@ class ApplicationController:
             else:
                 return {"error": f"Failed to launch with admin rights, error code: {result}"}
         
-        # Normal launch
-        process = subprocess.Popen(
-            cmd,
-            cwd=working_dir,
-            shell=True,
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
-        )
+        # Normal launch. A resolved executable is started directly; anything
+        # else (cmd built-ins, documents) still goes through the shell
+        try:
+            process = subprocess.Popen(
+                [resolved or app_name] + arguments,
+                cwd=working_dir,
+                shell=resolved is None,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+        except FileNotFoundError:
+            # The cached path went away; resolve again next time
+            self._resolved_paths.pop(app_name, None)
+            raise
         
         if wait:
             process.wait()
@@ -398,7 +785,7 @@ class ApplicationController:
         force: bool = False,
     ) -> Dict[str, Any]:
         """Close an application gracefully or forcefully"""
-        process_ctrl = ProcessController()
+        process_ctrl = get_process_controller()
         return process_ctrl.kill_process(pid=pid, name=identifier, force=force)
     
     def list_installed_applications(self) -> Dict[str, Any]:
@@ -408,62 +795,117 @@ class ApplicationController:
         else:
             return self._list_installed_unix()
     
+    def _load_installed_cache(self) -> Optional[Dict[str, Any]]:
+        """Load the on-disk installed-app cache, if any"""
+        try:
+            with open(self._installed_cache_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+    
+    def _save_installed_cache(self):
+        """Write the installed-app cache atomically"""
+        path = self._installed_cache_path
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._installed_cache, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.debug(f"Could not write installed-app cache: {e}")
+    
+    def _enumerate_uninstall_key(self, location) -> Dict[str, str]:
+        """Map DisplayName to DisplayVersion for one (hive, path) Uninstall key"""
+        import winreg
+        
+        hive, path = location
+        apps: Dict[str, str] = {}
+        try:
+            with winreg.OpenKey(hive, path) as key:
+                i = 0
+                while True:
+                    try:
+                        subkey_name = winreg.EnumKey(key, i)
+                    except OSError:
+                        break  # No more subkeys
+                    i += 1
+                    
+                    try:
+                        with winreg.OpenKey(key, subkey_name) as subkey:
+                            name = winreg.QueryValueEx(subkey, "DisplayName")[0]
+                            try:
+                                version = winreg.QueryValueEx(subkey, "DisplayVersion")[0]
+                            except OSError:
+                                version = ""
+                    except OSError:
+                        continue  # Unreadable, or no DisplayName
+                    
+                    apps.setdefault(name, version)
+        except OSError:
+            pass
+        return apps
+    
     def _list_installed_windows(self) -> Dict[str, Any]:
         """List installed Windows applications"""
         try:
             # Query registry for installed programs
             import winreg
             
-            apps = []
             paths = [
                 (winreg.HKEY_LOCAL_MACHINE, r"SOFTWARE\Microsoft\Windows\CurrentVersion\Uninstall"),
                 (winreg.HKEY_LOCAL_MACHINE, r"SOFTWARE\WOW6432Node\Microsoft\Windows\CurrentVersion\Uninstall"),
                 (winreg.HKEY_CURRENT_USER, r"SOFTWARE\Microsoft\Windows\CurrentVersion\Uninstall"),
             ]
             
+            # Installs and uninstalls add or remove a subkey, which bumps the
+            # parent key's subkey count or last-write time. Updaters that
+            # rewrite DisplayVersion in place only touch their own subkey,
+            # so matching tags are trusted only until the TTL runs out
+            tags = []
             for hive, path in paths:
                 try:
-                    key = winreg.OpenKey(hive, path)
-                    i = 0
-                    while True:
-                        try:
-                            subkey_name = winreg.EnumKey(key, i)
-                            subkey = winreg.OpenKey(key, subkey_name)
-                            
-                            try:
-                                name = winreg.QueryValueEx(subkey, "DisplayName")[0]
-                                version = ""
-                                try:
-                                    version = winreg.QueryValueEx(subkey, "DisplayVersion")[0]
-                                except:
-                                    pass
-                                
-                                apps.append({
-                                    "name": name,
-                                    "version": version,
-                                })
-                            except:
-                                pass
-                            
-                            winreg.CloseKey(subkey)
-                            i += 1
-                        except OSError:
-                            break
-                    winreg.CloseKey(key)
-                except:
-                    continue
+                    with winreg.OpenKey(hive, path) as key:
+                        subkey_count, _, last_write = winreg.QueryInfoKey(key)
+                    tags.append([path, subkey_count, last_write])
+                except OSError:
+                    tags.append([path, None, None])
+            
+            cache = self._installed_cache
+            now = time.time()
+            if (
+                cache
+                and cache.get("tags") == tags
+                and 0 <= now - cache.get("time", 0) < self._installed_ttl
+            ):
+                unique_apps = cache["applications"]
+                return {
+                    "result": {
+                        "applications": unique_apps,
+                        "count": len(unique_apps),
+                    }
+                }
+            
+            # The three trees are disjoint and winreg drops the GIL, so
+            # walking them concurrently costs about as long as the largest
+            with ThreadPoolExecutor(max_workers=len(paths)) as executor:
+                hive_apps = list(executor.map(self._enumerate_uninstall_key, paths))
+            
+            # name -> version; the first hive listing a name wins
+            apps_map: Dict[str, str] = {}
+            for apps in hive_apps:
+                for name, version in apps.items():
+                    apps_map.setdefault(name, version)
+            
+            # Sorting the names directly avoids a key function over dicts
+            unique_apps = [{"name": n, "version": apps_map[n]} for n in sorted(apps_map)]
             
-            # Remove duplicates
-            seen = set()
-            unique_apps = []
-            for app in apps:
-                if app['name'] not in seen:
-                    seen.add(app['name'])
-                    unique_apps.append(app)
+            self._installed_cache = {"tags": tags, "time": now, "applications": unique_apps}
+            self._save_installed_cache()
             
             return {
                 "result": {
-                    "applications": sorted(unique_apps, key=lambda x: x['name']),
+                    "applications": unique_apps,
                     "count": len(unique_apps),
                 }
             }
@@ -519,46 +961,56 @@ class WindowController:
     
     def _list_windows_win32(self, filter_title: str = None) -> Dict[str, Any]:
         """List windows using Win32 API"""
-        import ctypes
-        from ctypes import wintypes
-        
-        user32 = ctypes.windll.user32
         windows = []
+        needle = filter_title.casefold() if filter_title else None
+        
+        # One buffer for every window; nearly all titles fit, so a single
+        # GetWindowTextW (one WM_GETTEXT) per window is enough
+        buf_size = 1024
+        buffer = ctypes.create_unicode_buffer(buf_size)
         
         def enum_callback(hwnd, lparam):
-            if user32.IsWindowVisible(hwnd):
-                length = user32.GetWindowTextLengthW(hwnd) + 1
-                buffer = ctypes.create_unicode_buffer(length)
-                user32.GetWindowTextW(hwnd, buffer, length)
-                title = buffer.value
+            # Most top-level windows are hidden; skip them before any text query
+            if not _IsWindowVisible(hwnd):
+                return True
+            
+            length = _GetWindowTextW(hwnd, buffer, buf_size)
+            if length >= buf_size - 1:
+                # Possibly truncated; fall back to a buffer of the exact size
+                full_size = _GetWindowTextLengthW(hwnd) + 1
+                full = ctypes.create_unicode_buffer(full_size)
+                _GetWindowTextW(hwnd, full, full_size)
+                title = full.value
+            else:
+                # Slice to the returned length instead of scanning for the NUL
+                title = buffer[:length]
+            
+            if title:
+                if needle and needle not in title.casefold():
+                    return True
                 
-                if title:
-                    if filter_title and filter_title.lower() not in title.lower():
-                        return True
-                    
-                    # Get process ID
-                    pid = wintypes.DWORD()
-                    user32.GetWindowThreadProcessId(hwnd, ctypes.byref(pid))
-                    
-                    # Get window rect
-                    rect = wintypes.RECT()
-                    user32.GetWindowRect(hwnd, ctypes.byref(rect))
-                    
-                    windows.append({
-                        "handle": hwnd,
-                        "title": title,
-                        "process_id": pid.value,
-                        "rect": {
-                            "left": rect.left,
-                            "top": rect.top,
-                            "right": rect.right,
-                            "bottom": rect.bottom,
-                        }
-                    })
+                # Get process ID
+                pid = wintypes.DWORD()
+                _GetWindowThreadProcessId(hwnd, ctypes.byref(pid))
+                
+                # Get window rect
+                rect = wintypes.RECT()
+                _GetWindowRect(hwnd, ctypes.byref(rect))
+                
+                windows.append({
+                    "handle": hwnd,
+                    "title": title,
+                    "process_id": pid.value,
+                    "rect": {
+                        "left": rect.left,
+                        "top": rect.top,
+                        "right": rect.right,
+                        "bottom": rect.bottom,
+                    }
+                })
             return True
         
-        WNDENUMPROC = ctypes.WINFUNCTYPE(wintypes.BOOL, wintypes.HWND, wintypes.LPARAM)
-        user32.EnumWindows(WNDENUMPROC(enum_callback), 0)
+        _EnumWindows(_WNDENUMPROC(enum_callback), 0)
         
         return {
             "result": {
@@ -583,17 +1035,14 @@ class WindowController:
     def focus_window(self, handle: int = None, title: str = None) -> Dict[str, Any]:
         """Bring a window to the foreground"""
         if IS_WINDOWS:
-            import ctypes
-            user32 = ctypes.windll.user32
-            
             if handle is None and title:
                 # Find window by title
-                handle = user32.FindWindowW(None, title)
+                handle = _FindWindowW(None, title)
                 if not handle:
                     return {"error": f"Window not found: {title}"}
             
             if handle:
-                user32.SetForegroundWindow(handle)
+                _SetForegroundWindow(handle)
                 return {"result": {"focused": True, "handle": handle}}
         
         return {"error": "Window focus not available on this platform"}
@@ -601,9 +1050,7 @@ class WindowController:
     def minimize_window(self, handle: int) -> Dict[str, Any]:
         """Minimize a window"""
         if IS_WINDOWS:
-            import ctypes
-            user32 = ctypes.windll.user32
-            user32.ShowWindow(handle, 6)  # SW_MINIMIZE
+            _ShowWindow(handle, 6)  # SW_MINIMIZE
             return {"result": {"minimized": True, "handle": handle}}
         
         return {"error": "Not available on this platform"}
@@ -611,9 +1058,7 @@ class WindowController:
     def maximize_window(self, handle: int) -> Dict[str, Any]:
         """Maximize a window"""
         if IS_WINDOWS:
-            import ctypes
-            user32 = ctypes.windll.user32
-            user32.ShowWindow(handle, 3)  # SW_MAXIMIZE
+            _ShowWindow(handle, 3)  # SW_MAXIMIZE
             return {"result": {"maximized": True, "handle": handle}}
         
         return {"error": "Not available on this platform"}
@@ -621,12 +1066,8 @@ class WindowController:
     def close_window(self, handle: int) -> Dict[str, Any]:
         """Close a window gracefully"""
         if IS_WINDOWS:
-            import ctypes
-            from ctypes import wintypes
-            user32 = ctypes.windll.user32
-            
             WM_CLOSE = 0x0010
-            user32.PostMessageW(handle, WM_CLOSE, 0, 0)
+            _PostMessageW(handle, WM_CLOSE, 0, 0)
             return {
                 "result": {"closed": True, "handle": handle},
                 "side_effects": [{